@@ -1,50 +1,185 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Union
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import JWTError, jwk, jwt
+import bcrypt
+from sqlalchemy import bindparam, delete, select, text, true, update
 from sqlalchemy.orm import Session
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
 import models
-import schemas
-from database import SessionLocal
+from database import get_db
 from config import (
     SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA,
-    REFRESH_TOKEN_EXPIRE_DELTA, BCRYPT_ROUNDS, MAX_LOGIN_ATTEMPTS,
+    REFRESH_TOKEN_EXPIRE_DELTA, BCRYPT_ROUNDS, BCRYPT_MAX_WORKERS, MAX_LOGIN_ATTEMPTS,
     LOCKOUT_DURATION_DELTA
 )
+import hashlib
+import os
 import secrets
+import threading
+import time
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# Hash identifiers handled by the bcrypt C extension directly
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+# bcrypt is CPU-bound; the sync auth routes run in Starlette's threadpool,
+# which has far more workers than cores, so hashing is funnelled through a
+# pool sized to the CPU count to keep concurrent logins from oversubscribing.
+# The bcrypt extension releases the GIL while hashing, so the workers run
+# in parallel across cores.
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=BCRYPT_MAX_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="bcrypt"
+)
+
+@lru_cache(maxsize=None)
+def _legacy_pwd_context():
+    """Passlib context for non-bcrypt hashes, built only when one is seen."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# JWT key built once; with python-jose[cryptography] this is the OpenSSL-backed
+# HMAC key, and passing it in skips jwk.construct on every encode/decode
+JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+
+class BearerToken(HTTPBearer):
+    """Bearer scheme that returns the raw token string.
+
+    Keeps HTTPBearer's OpenAPI registration but skips building an
+    HTTPAuthorizationCredentials model on every request.
+    """
+
+    async def __call__(self, request: Request) -> str:
+        authorization = request.headers.get("authorization", "")
+        if authorization[:7].lower() != "bearer " or not authorization[7:]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authenticated"
+            )
+        return authorization[7:]
 
 # Security scheme
-security = HTTPBearer()
+security = BearerToken()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Bulk deletes for expired tokens, built once and reused by every sweep
+_DELETE_EXPIRED_REFRESH_TOKENS = delete(models.RefreshToken).where(
+    models.RefreshToken.expires_at < bindparam("now")
+).execution_options(synchronize_session=False)
+_DELETE_EXPIRED_BLACKLISTED_TOKENS = delete(models.BlacklistedToken).where(
+    models.BlacklistedToken.expires_at < bindparam("now")
+).execution_options(synchronize_session=False)
+
+# Per-process front cache of blacklisted access tokens, so verify_token does
+# not hit the database on every request. It is reloaded from the database
+# periodically so logouts handled by other worker processes are picked up.
+_BLACKLIST_REFRESH_SECONDS = 30
+_LIVE_BLACKLIST_SQL = text("SELECT token_hash FROM blacklisted_tokens WHERE expires_at > :now")
+_blacklisted_tokens: set = set()
+_blacklist_loaded_at: Optional[float] = None
+
+def hash_token(token: str) -> bytes:
+    """Return the fixed-width SHA-256 digest used to look up stored tokens."""
+    return hashlib.sha256(token.encode()).digest()
+
+def _get_blacklisted_tokens(db: Session) -> set:
+    """Return the cached set of unexpired blacklisted token hashes."""
+    global _blacklisted_tokens, _blacklist_loaded_at
+    now = time.monotonic()
+    if _blacklist_loaded_at is None or now - _blacklist_loaded_at > _BLACKLIST_REFRESH_SECONDS:
+        _blacklisted_tokens = set(
+            db.execute(_LIVE_BLACKLIST_SQL, {"now": datetime.utcnow()}).scalars()
+        )
+        _blacklist_loaded_at = now
+    return _blacklisted_tokens
+
+# Hot lookups built once; executions reuse the engine's compiled-SQL cache
+_USER_BY_EMAIL = select(models.User).where(models.User.email == bindparam("identifier")).limit(1)
+_USER_BY_USERNAME = select(models.User).where(models.User.username == bindparam("identifier")).limit(1)
+_REFRESH_TOKEN_BY_HASH = select(models.RefreshToken).where(
+    models.RefreshToken.token_hash == bindparam("token_hash")
+).limit(1)
+
+# Claims this app never issues; skipping them saves work in jwt.decode
+_JWT_DECODE_OPTIONS = {
+    "verify_aud": False,
+    "verify_iss": False,
+    "verify_jti": False,
+    "verify_at_hash": False,
+}
+
+@dataclass(frozen=True, slots=True)
+class VerifiedToken:
+    """Claims of a verified access token, without pydantic validation."""
+    user_id: int
+    username: Optional[str] = None
+    role: Optional[str] = None
+    exp: Optional[int] = None
+
+# Short-lived LRU of verified access tokens, so a token reused across
+# several requests within a few seconds skips the JWT signature check.
+# Entries never outlive the token's own expiry and are dropped on logout.
+_VERIFIED_TOKEN_TTL_SECONDS = 30
+_VERIFIED_TOKEN_CACHE_SIZE = 10_000
+_verified_tokens: OrderedDict = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
+def _get_cached_token(token: str) -> Optional[VerifiedToken]:
+    """Return the cached verification result for a token, if still fresh."""
+    with _verified_tokens_lock:
+        entry = _verified_tokens.get(token)
+        if entry is None:
+            return None
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            del _verified_tokens[token]
+            return None
+        _verified_tokens.move_to_end(token)
+        return token_data
+
+def _cache_token(token: str, token_data: VerifiedToken):
+    """Remember a verified token until the cache TTL or the token's exp."""
+    expires_at = time.time() + _VERIFIED_TOKEN_TTL_SECONDS
+    if token_data.exp is not None:
+        expires_at = min(expires_at, token_data.exp)
+    with _verified_tokens_lock:
+        _verified_tokens[token] = (expires_at, token_data)
+        _verified_tokens.move_to_end(token)
+        if len(_verified_tokens) > _VERIFIED_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    if not hashed_password:
+        return False
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        return _bcrypt_executor.submit(
+            bcrypt.checkpw, plain_password.encode(), hashed_password.encode()
+        ).result()
+    return _legacy_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return _bcrypt_executor.submit(
+        bcrypt.hashpw, password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    ).result().decode()
+
+# Hash verified against when the user does not exist, so unknown and known
+# usernames cost the same single bcrypt operation
+_DUMMY_HASH = get_password_hash("not-a-real-password")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create an access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + ACCESS_TOKEN_EXPIRE_DELTA
+    if "sub" in to_encode:
+        # JWT requires a string subject; verify_token casts it back to int
+        to_encode["sub"] = str(to_encode["sub"])
+    expire = datetime.utcnow() + (expires_delta or ACCESS_TOKEN_EXPIRE_DELTA)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(user_id: int, db: Session) -> str:
@@ -56,6 +191,7 @@ def create_refresh_token(user_id: int, db: Session) -> str:
     # Store in database
     db_token = models.RefreshToken(
         token=token,
+        token_hash=hash_token(token),
         user_id=user_id,
         expires_at=expires_at
     )
@@ -64,7 +200,7 @@ def create_refresh_token(user_id: int, db: Session) -> str:
     
     return token
 
-def verify_token(token: str, db: Session) -> schemas.TokenData:
+def verify_token(token: str, db: Session) -> VerifiedToken:
     """Verify and decode a JWT token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,41 +210,40 @@ def verify_token(token: str, db: Session) -> schemas.TokenData:
     
     try:
         # Check if token is blacklisted
-        blacklisted = db.query(models.BlacklistedToken).filter(
-            models.BlacklistedToken.token == token
-        ).first()
-        if blacklisted:
+        if hash_token(token) in _get_blacklisted_tokens(db):
             raise credentials_exception
         
-        # Decode token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        username: str = payload.get("username")
-        role: str = payload.get("role")
-        exp: int = payload.get("exp")
+        cached = _get_cached_token(token)
+        if cached is not None:
+            return cached
         
-        if user_id is None:
+        # Decode token
+        payload = jwt.decode(token, JWT_KEY, algorithms=[ALGORITHM], options=_JWT_DECODE_OPTIONS)
+        try:
+            user_id = int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
             raise credentials_exception
-            
-        token_data = schemas.TokenData(
+        
+        token_data = VerifiedToken(
             user_id=user_id,
-            username=username,
-            role=role,
-            exp=exp
+            username=payload.get("username"),
+            role=payload.get("role"),
+            exp=payload.get("exp")
         )
+        _cache_token(token, token_data)
         return token_data
     except JWTError:
         raise credentials_exception
 
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: str = Depends(security),
     db: Session = Depends(get_db)
 ) -> models.User:
     """Get the current authenticated user."""
-    token = credentials.credentials
     token_data = verify_token(token, db)
     
-    user = db.query(models.User).filter(models.User.id == token_data.user_id).first()
+    # Primary-key fetch; served from the identity map when already loaded
+    user = db.get(models.User, token_data.user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,23 +259,19 @@ def get_current_user(
     
     return user
 
-def get_current_active_user(
-    current_user: models.User = Depends(get_current_user)
-) -> models.User:
-    """Ensure the current user is active."""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user"
-        )
-    return current_user
+# get_current_user already rejects inactive users; the alias keeps the
+# existing dependency name working without a second check per request
+get_current_active_user = get_current_user
+
+# Role ranks, higher includes the permissions of lower
+_ROLE_RANK = {"guest": 0, "user": 1, "admin": 2}
 
 def check_user_role(required_role: str):
     """Dependency to check if user has required role."""
+    required_rank = _ROLE_RANK.get(required_role, 0)
+    
     def role_checker(current_user: models.User = Depends(get_current_active_user)):
-        role_hierarchy = {"guest": 0, "user": 1, "admin": 2}
-        
-        if role_hierarchy.get(current_user.role, 0) < role_hierarchy.get(required_role, 0):
+        if _ROLE_RANK.get(current_user.role, 0) < required_rank:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Not enough permissions. Required role: {required_role}"
@@ -148,17 +279,38 @@ def check_user_role(required_role: str):
         return current_user
     return role_checker
 
+def task_scope(user: models.User):
+    """SQL predicate for the tasks a user may see: all of them for admins, otherwise their own."""
+    return true() if user.role == "admin" else models.Task.user_id == user.id
+
+def _update_login_state(db: Session, user_id: int, failed_attempts: int, locked_until: Optional[datetime]):
+    """Write a user's failed-login counter and lockout in one UPDATE and commit."""
+    db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(failed_login_attempts=failed_attempts, locked_until=locked_until)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
 def authenticate_user(db: Session, username: str, password: str) -> Union[models.User, None]:
     """Authenticate a user by username and password."""
-    user = db.query(models.User).filter(
-        (models.User.username == username) | (models.User.email == username)
-    ).first()
+    # Look up by a single unique column instead of OR-ing username and email,
+    # falling back to username for the rare username that contains "@"
+    user = None
+    if "@" in username:
+        user = db.execute(_USER_BY_EMAIL, {"identifier": username}).scalars().first()
+    if user is None:
+        user = db.execute(_USER_BY_USERNAME, {"identifier": username}).scalars().first()
     
     if not user:
+        verify_password(password, _DUMMY_HASH)
         return None
     
+    now = datetime.utcnow()
+    
     # Check if account is locked
-    if user.locked_until and user.locked_until > datetime.utcnow():
+    if user.locked_until and user.locked_until > now:
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail=f"Account locked until {user.locked_until.isoformat()}"
@@ -166,34 +318,30 @@ def authenticate_user(db: Session, username: str, password: str) -> Union[models
     
     # Verify password
     if not verify_password(password, user.hashed_password):
-        # Increment failed login attempts
-        user.failed_login_attempts += 1
+        # Record the failed attempt and any lockout in a single UPDATE
+        failed_attempts = (user.failed_login_attempts or 0) + 1
+        locked_until = None
+        if failed_attempts >= MAX_LOGIN_ATTEMPTS:
+            locked_until = now + LOCKOUT_DURATION_DELTA
         
-        # Lock account if too many failed attempts
-        if user.failed_login_attempts >= MAX_LOGIN_ATTEMPTS:
-            user.locked_until = datetime.utcnow() + LOCKOUT_DURATION_DELTA
-            db.commit()
+        _update_login_state(db, user.id, failed_attempts, locked_until)
+        
+        if locked_until:
             raise HTTPException(
                 status_code=status.HTTP_423_LOCKED,
                 detail=f"Account locked due to too many failed login attempts"
             )
-        
-        db.commit()
         return None
     
     # Reset failed login attempts on successful login
     if user.failed_login_attempts > 0:
-        user.failed_login_attempts = 0
-        user.locked_until = None
-        db.commit()
+        _update_login_state(db, user.id, 0, None)
     
     return user
 
 def revoke_refresh_token(token: str, db: Session) -> bool:
     """Revoke a refresh token."""
-    db_token = db.query(models.RefreshToken).filter(
-        models.RefreshToken.token == token
-    ).first()
+    db_token = db.execute(_REFRESH_TOKEN_BY_HASH, {"token_hash": hash_token(token)}).scalars().first()
     
     if db_token:
         db_token.revoked = True
@@ -203,25 +351,24 @@ def revoke_refresh_token(token: str, db: Session) -> bool:
 
 def blacklist_token(token: str, expires_at: datetime, db: Session):
     """Add a token to the blacklist."""
+    token_hash = hash_token(token)
     blacklisted = models.BlacklistedToken(
         token=token,
+        token_hash=token_hash,
         expires_at=expires_at
     )
     db.add(blacklisted)
     db.commit()
+    _blacklisted_tokens.add(token_hash)
+    with _verified_tokens_lock:
+        _verified_tokens.pop(token, None)
 
 def cleanup_expired_tokens(db: Session):
     """Remove expired tokens from the database."""
     now = datetime.utcnow()
     
-    # Remove expired refresh tokens
-    db.query(models.RefreshToken).filter(
-        models.RefreshToken.expires_at < now
-    ).delete()
-    
-    # Remove expired blacklisted tokens
-    db.query(models.BlacklistedToken).filter(
-        models.BlacklistedToken.expires_at < now
-    ).delete()
+    # Remove expired refresh and blacklisted tokens in one statement each
+    db.execute(_DELETE_EXPIRED_REFRESH_TOKENS, {"now": now})
+    db.execute(_DELETE_EXPIRED_BLACKLISTED_TOKENS, {"now": now})
     
     db.commit()
\ No newline at end of file
@@ -11,19 +11,24 @@ Provides efficient bulk operations for tasks including:
 """
 import asyncio
 import json
+import time
+import zlib
+from collections import deque
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple, Union
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, not_, func
+from sqlalchemy import and_, or_, not_, func, insert, case, update, bindparam, select
 from sqlalchemy.exc import IntegrityError
-from pydantic import BaseModel
+from pydantic import ValidationError
 
 from models import Task, User
+from schemas import TaskCreate
 from cache import cache_service
+from auth import task_scope
 from search import search_service
 
 
@@ -48,7 +53,7 @@ class OperationStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class BulkOperation:
     """Bulk operation metadata."""
     id: str
@@ -58,15 +63,47 @@ class BulkOperation:
     total_items: int
     processed_items: int = 0
     failed_items: int = 0
-    created_at: datetime = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     undo_data: Optional[Dict[str, Any]] = None
+    _last_flush_at: float = field(default=0.0, repr=False, compare=False)
     
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.utcnow()
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the cache payload for this operation (undo data stays in memory)."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "operation_type": self.operation_type,
+            "status": self.status,
+            "total_items": self.total_items,
+            "processed_items": self.processed_items,
+            "failed_items": self.failed_items,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "error_message": self.error_message
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BulkOperation":
+        """Rebuild an operation, with enums and datetimes, from its cache payload."""
+        started_at = data.get("started_at")
+        completed_at = data.get("completed_at")
+        return cls(
+            id=data["id"],
+            user_id=data["user_id"],
+            operation_type=BulkOperationType(data["operation_type"]),
+            status=OperationStatus(data["status"]),
+            total_items=data["total_items"],
+            processed_items=data.get("processed_items", 0),
+            failed_items=data.get("failed_items", 0),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            started_at=datetime.fromisoformat(started_at) if started_at else None,
+            completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+            error_message=data.get("error_message")
+        )
     
     @property
     def progress_percentage(self) -> float:
@@ -81,16 +118,159 @@ class BulkOperation:
         return self.status in [OperationStatus.COMPLETED, OperationStatus.FAILED, OperationStatus.CANCELLED]
 
 
-class TaskTemplate(BaseModel):
+@dataclass(slots=True)
+class TaskTemplate:
     """Task template for common workflows."""
-    id: Optional[str] = None
     name: str
-    description: Optional[str] = None
     tasks: List[Dict[str, Any]]
+    id: Optional[str] = None
+    description: Optional[str] = None
     category: Optional[str] = None
     is_public: bool = False
     created_by: Optional[int] = None
     created_at: Optional[datetime] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the cache payload for this template."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "tasks": self.tasks,
+            "category": self.category,
+            "is_public": self.is_public,
+            "created_by": self.created_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskTemplate":
+        """Rebuild a template from its cache payload."""
+        created_at = data.get("created_at")
+        return cls(
+            id=data.get("id"),
+            name=data["name"],
+            description=data.get("description"),
+            tasks=data["tasks"],
+            category=data.get("category"),
+            is_public=data.get("is_public", False),
+            created_by=data.get("created_by"),
+            created_at=datetime.fromisoformat(created_at) if created_at else None
+        )
+
+
+# Progress is written to the cache every N items or T seconds, and always at the end
+PROGRESS_FLUSH_ITEMS = 100
+PROGRESS_FLUSH_SECONDS = 0.25
+
+# Rows per multi-row INSERT in bulk_create_tasks
+BULK_INSERT_CHUNK_SIZE = 1000
+
+_TASK_COLUMNS = frozenset(column.key for column in Task.__table__.columns)
+# Fields a client may set on bulk-created tasks; ids, positions and timestamps come from the database
+_TASK_CREATE_FIELDS = frozenset(TaskCreate.model_fields)
+_TASK_FIELDS = (
+    "id", "title", "description", "completed", "priority",
+    "due_date", "user_id", "created_at", "updated_at"
+)
+_TASK_RETURNING = tuple(getattr(Task, name) for name in _TASK_FIELDS)
+
+# Columns _insert_tasks writes, and the value for each one a row leaves out. title is required;
+# the timestamps are only written when some row in the batch carries them (undo restores them)
+_TASK_INSERT_DEFAULTS = {
+    "description": None,
+    "completed": False,
+    "priority": "medium",
+    "due_date": None,
+    "user_id": None,
+    "position": 0
+}
+_TASK_INSERT_COLUMNS = ("title", *_TASK_INSERT_DEFAULTS)
+_TASK_TIMESTAMPS = ("created_at", "updated_at")
+
+# Undo of a bulk update: SET comes from each parameter row's column keys
+_RESTORE_UPDATED_TASK = update(Task.__table__).where(
+    Task.__table__.c.id == bindparam("b_id"),
+    Task.__table__.c.updated_at == bindparam("b_anchor")
+)
+
+
+def _serialize_task(row) -> Dict[str, Any]:
+    """Convert a row of _TASK_RETURNING columns, in that order, to a dict."""
+    # Positional unpacking is much cheaper than attribute access on Row
+    id_, title, description, completed, priority, due_date, user_id, created_at, updated_at = row
+    return {
+        "id": id_,
+        "title": title,
+        "description": description,
+        "completed": completed,
+        "priority": priority,
+        "due_date": due_date.isoformat() if due_date else None,
+        "user_id": user_id,
+        "created_at": created_at.isoformat(),
+        "updated_at": updated_at.isoformat()
+    }
+
+
+def _pack_tasks(tasks: List[Dict[str, Any]]) -> bytes:
+    """Compress serialized task rows held for undo."""
+    return zlib.compress(json.dumps(tasks).encode())
+
+
+def _unpack_tasks(blob: bytes) -> List[Dict[str, Any]]:
+    """Decompress task rows packed by _pack_tasks, ready for re-insertion."""
+    tasks = json.loads(zlib.decompress(blob))
+    for task in tasks:
+        task.pop("id", None)  # Remove ID for new creation
+        for key in ("due_date", "created_at", "updated_at"):
+            if task[key]:
+                task[key] = datetime.fromisoformat(task[key])
+    return tasks
+
+
+def _user_tasks_query(db: Session, user: User, task_ids):
+    """Query the given tasks, limited to the user's own unless they are an admin."""
+    # For users this is served by ix_tasks_user_id_id rather than a PK probe per id plus a filter
+    return db.query(Task).filter(task_scope(user), Task.id.in_(task_ids))
+
+
+def _normalize_task_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Give every row the same key set, so one executemany can insert them all.
+    
+    Keys outside the insert columns are dropped and missing columns are filled with their defaults.
+    """
+    columns = _TASK_INSERT_COLUMNS
+    defaults = _TASK_INSERT_DEFAULTS
+    timestamps = [key for key in _TASK_TIMESTAMPS if any(key in row for row in rows)]
+    if timestamps:
+        now = datetime.utcnow()
+        columns = (*columns, *timestamps)
+        defaults = {**defaults, **dict.fromkeys(timestamps, now)}
+    return [{column: row.get(column, defaults.get(column)) for column in columns} for row in rows]
+
+
+def _insert_tasks(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert task rows in one executemany and return them serialized."""
+    rows = _normalize_task_rows(rows)
+    if db.get_bind().dialect.insert_executemany_returning:
+        # RETURNING order isn't guaranteed for multi-row INSERTs; ids are
+        # assigned in input order, so sort on them instead of forcing
+        # sort_by_parameter_order (which degrades to one INSERT per row)
+        result = db.execute(insert(Task.__table__).returning(*_TASK_RETURNING), rows)
+        return [_serialize_task(row) for row in sorted(result, key=lambda row: row.id)]
+    
+    # No multi-row RETURNING: let the unit of work batch the INSERTs in one flush
+    db_tasks = [Task(**row) for row in rows]
+    db.add_all(db_tasks)
+    db.flush()
+    # Server-side defaults are expired after the flush; read the rows back in one SELECT
+    # rather than a refresh per task
+    result = db.execute(
+        select(*_TASK_RETURNING)
+        .where(Task.id.in_([task.id for task in db_tasks]))
+        .order_by(Task.id)
+    )
+    return [_serialize_task(row) for row in result]
 
 
 class BulkOperationService:
@@ -98,7 +278,7 @@ class BulkOperationService:
     
     def __init__(self):
         self._active_operations: Dict[str, BulkOperation] = {}
-        self._undo_stack: Dict[int, List[BulkOperation]] = {}  # user_id -> operations
+        self._undo_stack: Dict[int, deque] = {}  # user_id -> operations, oldest first
         self._max_undo_operations = 10
     
     async def create_bulk_operation(
@@ -108,7 +288,7 @@ class BulkOperationService:
         total_items: int
     ) -> str:
         """Create a new bulk operation tracking record."""
-        operation_id = str(uuid4())
+        operation_id = uuid4().hex
         operation = BulkOperation(
             id=operation_id,
             user_id=user_id,
@@ -118,11 +298,12 @@ class BulkOperationService:
         )
         
         self._active_operations[operation_id] = operation
+        operation._last_flush_at = time.monotonic()
         
         # Cache operation for status tracking
         await cache_service.set(
             f"bulk_op_{operation_id}",
-            asdict(operation),
+            operation.to_dict(),
             ttl=3600,  # 1 hour
             prefix="bulk:"
         )
@@ -134,9 +315,10 @@ class BulkOperationService:
         operation_id: str,
         processed: int,
         failed: int = 0,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        now: Optional[datetime] = None
     ):
-        """Update operation progress."""
+        """Update operation progress, stamping transitions with now if given."""
         if operation_id not in self._active_operations:
             return
         
@@ -147,18 +329,28 @@ class BulkOperationService:
         if error_message:
             operation.error_message = error_message
             operation.status = OperationStatus.FAILED
-            operation.completed_at = datetime.utcnow()
+            operation.completed_at = now or datetime.utcnow()
         elif processed >= operation.total_items:
             operation.status = OperationStatus.COMPLETED
-            operation.completed_at = datetime.utcnow()
+            operation.completed_at = now or datetime.utcnow()
         elif operation.status == OperationStatus.PENDING:
             operation.status = OperationStatus.RUNNING
-            operation.started_at = datetime.utcnow()
+            operation.started_at = now or datetime.utcnow()
+        
+        # Memory is always current; only flush to the cache periodically
+        now = time.monotonic()
+        if not (
+            operation.is_completed
+            or processed % PROGRESS_FLUSH_ITEMS == 0
+            or now - operation._last_flush_at >= PROGRESS_FLUSH_SECONDS
+        ):
+            return
+        operation._last_flush_at = now
         
         # Update cache
         await cache_service.set(
             f"bulk_op_{operation_id}",
-            asdict(operation),
+            operation.to_dict(),
             ttl=3600,
             prefix="bulk:"
         )
@@ -172,7 +364,7 @@ class BulkOperationService:
         # Try cache
         cached_data = await cache_service.get(f"bulk_op_{operation_id}", "bulk:")
         if cached_data:
-            return BulkOperation(**cached_data)
+            return BulkOperation.from_dict(cached_data)
         
         return None
     
@@ -191,44 +383,46 @@ class BulkOperationService:
         
         created_tasks = []
         failed_items = 0
+        error_message = None
         
         try:
-            for i, task_data in enumerate(tasks_data):
+            # Invalid rows fail individually, the rest go in one batch
+            rows = []
+            for task_data in tasks_data:
+                unknown = task_data.keys() - _TASK_CREATE_FIELDS
+                if unknown:
+                    failed_items += 1
+                    error_message = f"Unknown task field(s): {', '.join(sorted(unknown))}"
+                    continue
                 try:
-                    # Add user_id to task data
-                    task_data["user_id"] = user.id
-                    
-                    # Create task
-                    db_task = Task(**task_data)
-                    db.add(db_task)
-                    db.flush()  # Get ID without committing
-                    
-                    created_tasks.append({
-                        "id": db_task.id,
-                        "title": db_task.title,
-                        "description": db_task.description,
-                        "completed": db_task.completed,
-                        "priority": db_task.priority,
-                        "due_date": db_task.due_date.isoformat() if db_task.due_date else None,
-                        "user_id": db_task.user_id,
-                        "created_at": db_task.created_at.isoformat(),
-                        "updated_at": db_task.updated_at.isoformat()
-                    })
-                    
-                    await self.update_operation_progress(operation_id, i + 1, failed_items)
-                    
-                except Exception as e:
+                    # Coerces e.g. ISO due_date strings and fills defaults, so
+                    # every row shares one key set and one INSERT batch
+                    task = TaskCreate.model_validate(task_data)
+                except ValidationError as e:
                     failed_items += 1
-                    await self.update_operation_progress(
-                        operation_id, i + 1, failed_items, str(e)
-                    )
+                    error_message = str(e)
+                    continue
+                rows.append({**task.model_dump(), "user_id": user.id})
+            
+            processed = failed_items
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
+                created_tasks.extend(_insert_tasks(db, chunk))
+                processed += len(chunk)
+                await self.update_operation_progress(
+                    operation_id, processed, failed_items, error_message
+                )
+            
+            if not rows:
+                await self.update_operation_progress(
+                    operation_id, processed, failed_items, error_message
+                )
             
             # Commit all changes
             db.commit()
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             # Store undo data
             operation = await self.get_operation_status(operation_id)
@@ -264,46 +458,38 @@ class BulkOperationService:
         
         try:
             # Get existing tasks for undo data
-            original_tasks = []
-            query = db.query(Task).filter(Task.id.in_(task_ids))
-            if user.role != "admin":
-                query = query.filter(Task.user_id == user.id)
+            query = _user_tasks_query(db, user, task_ids)
             
-            tasks = query.all()
+            values = {
+                key: value for key, value in update_data.items()
+                if key in _TASK_COLUMNS and key != "id"
+            }
             
-            for task in tasks:
-                original_tasks.append({
-                    "id": task.id,
-                    "title": task.title,
-                    "description": task.description,
-                    "completed": task.completed,
-                    "priority": task.priority,
-                    "due_date": task.due_date.isoformat() if task.due_date else None,
-                    "updated_at": task.updated_at.isoformat()
-                })
-            
-            # Update tasks
-            processed = 0
-            for task in tasks:
-                for key, value in update_data.items():
-                    if hasattr(task, key):
-                        setattr(task, key, value)
-                
-                processed += 1
-                await self.update_operation_progress(operation_id, processed)
+            # Undo only needs the old values of the fields being changed
+            undo_columns = {key: getattr(Task, key) for key in values}
+            undo_columns["updated_at"] = Task.updated_at
+            tasks = query.with_entities(Task.id, *undo_columns.values()).all()
+            original_tasks = [dict(task._mapping) for task in tasks]
+            
+            # Update tasks in one statement. The updated_at written here is
+            # the anchor undo checks to skip rows edited since.
+            anchor = datetime.utcnow()
+            if tasks and values:
+                query.update({**values, "updated_at": anchor}, synchronize_session=False)
             
             db.commit()
+            await self.update_operation_progress(operation_id, len(tasks), now=anchor)
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             # Store undo data
             operation = await self.get_operation_status(operation_id)
             if operation:
                 operation.undo_data = {
                     "operation": "update",
-                    "tasks": original_tasks
+                    "tasks": original_tasks,
+                    "anchor": anchor
                 }
                 await self._add_to_undo_stack(user.id, operation)
             
@@ -331,41 +517,28 @@ class BulkOperationService:
         
         try:
             # Get tasks for undo data
-            query = db.query(Task).filter(Task.id.in_(task_ids))
-            if user.role != "admin":
-                query = query.filter(Task.user_id == user.id)
+            query = _user_tasks_query(db, user, task_ids)
             
-            tasks = query.all()
-            deleted_tasks = []
+            deleted_tasks = [
+                _serialize_task(task) for task in query.with_entities(*_TASK_RETURNING)
+            ]
             
-            for task in tasks:
-                deleted_tasks.append({
-                    "id": task.id,
-                    "title": task.title,
-                    "description": task.description,
-                    "completed": task.completed,
-                    "priority": task.priority,
-                    "due_date": task.due_date.isoformat() if task.due_date else None,
-                    "user_id": task.user_id,
-                    "created_at": task.created_at.isoformat(),
-                    "updated_at": task.updated_at.isoformat()
-                })
-                
-                db.delete(task)
-                await self.update_operation_progress(operation_id, len(deleted_tasks))
+            # Delete them in one statement
+            if deleted_tasks:
+                query.delete(synchronize_session=False)
             
             db.commit()
+            await self.update_operation_progress(operation_id, len(deleted_tasks))
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             # Store undo data
             operation = await self.get_operation_status(operation_id)
             if operation:
                 operation.undo_data = {
                     "operation": "create",
-                    "tasks": deleted_tasks
+                    "tasks": _pack_tasks(deleted_tasks)
                 }
                 await self._add_to_undo_stack(user.id, operation)
             
@@ -416,27 +589,25 @@ class BulkOperationService:
         )
         
         try:
-            # For simplicity, we'll use updated_at to track order
-            # In a real app, you might add a position/order field
-            
-            processed = 0
-            for item in task_positions:
-                task_id = item["id"]
-                # Use a timestamp-based ordering system
-                # Earlier positions get earlier timestamps
-                order_time = datetime.utcnow() - timedelta(seconds=item["position"])
-                
-                task = db.query(Task).filter(Task.id == task_id).first()
-                if task and (user.role == "admin" or task.user_id == user.id):
-                    task.updated_at = order_time
-                    processed += 1
-                    await self.update_operation_progress(operation_id, processed)
+            # Set every position with a single UPDATE ... SET position = CASE id ... END
+            positions = {item["id"]: item["position"] for item in task_positions}
+            if not positions:
+                # A CASE with no WHEN branches is invalid SQL; there is nothing to reorder
+                await self.update_operation_progress(operation_id, 0)
+                return operation_id
+            
+            query = _user_tasks_query(db, user, positions)
+            
+            processed = query.update(
+                {Task.position: case(positions, value=Task.id)},
+                synchronize_session=False
+            )
             
             db.commit()
+            await self.update_operation_progress(operation_id, processed)
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             return operation_id
             
@@ -464,16 +635,10 @@ class BulkOperationService:
         duplicated_tasks = []
         
         try:
-            query = db.query(Task).filter(Task.id.in_(task_ids))
-            if user.role != "admin":
-                query = query.filter(Task.user_id == user.id)
-            
-            tasks = query.all()
-            processed = 0
+            query = _user_tasks_query(db, user, task_ids)
             
-            for task in tasks:
-                # Create duplicate
-                duplicate_data = {
+            duplicates = [
+                {
                     "title": task.title + suffix,
                     "description": task.description,
                     "priority": task.priority,
@@ -481,31 +646,19 @@ class BulkOperationService:
                     "user_id": user.id,
                     "completed": False  # Reset completion status
                 }
-                
-                db_task = Task(**duplicate_data)
-                db.add(db_task)
-                db.flush()
-                
-                duplicated_tasks.append({
-                    "id": db_task.id,
-                    "title": db_task.title,
-                    "description": db_task.description,
-                    "completed": db_task.completed,
-                    "priority": db_task.priority,
-                    "due_date": db_task.due_date.isoformat() if db_task.due_date else None,
-                    "user_id": db_task.user_id,
-                    "created_at": db_task.created_at.isoformat(),
-                    "updated_at": db_task.updated_at.isoformat()
-                })
-                
-                processed += 1
-                await self.update_operation_progress(operation_id, processed)
+                for task in query.with_entities(
+                    Task.title, Task.description, Task.priority, Task.due_date
+                )
+            ]
+            
+            if duplicates:
+                duplicated_tasks = _insert_tasks(db, duplicates)
+            await self.update_operation_progress(operation_id, len(duplicated_tasks))
             
             db.commit()
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             return operation_id, duplicated_tasks
             
@@ -548,19 +701,20 @@ class BulkOperationService:
                 
             elif undo_data["operation"] == "create":
                 # Undo delete: recreate the tasks
-                for task_data in undo_data["tasks"]:
-                    task_data.pop("id", None)  # Remove ID for new creation
-                    db_task = Task(**task_data)
-                    db.add(db_task)
+                tasks = _unpack_tasks(undo_data["tasks"])
+                if tasks:
+                    _insert_tasks(db, tasks)
                 
             elif undo_data["operation"] == "update":
-                # Undo update: restore original values
-                for task_data in undo_data["tasks"]:
-                    task = db.query(Task).filter(Task.id == task_data["id"]).first()
-                    if task:
-                        for key, value in task_data.items():
-                            if key != "id" and hasattr(task, key):
-                                setattr(task, key, value)
+                # Undo update: restore original values on rows still at the anchor
+                if undo_data["tasks"]:
+                    db.execute(
+                        _RESTORE_UPDATED_TASK,
+                        [
+                            {**task_data, "b_id": task_data["id"], "b_anchor": undo_data["anchor"]}
+                            for task_data in undo_data["tasks"]
+                        ]
+                    )
             
             db.commit()
             
@@ -569,8 +723,7 @@ class BulkOperationService:
                 user_stack.remove(operation)
             
             # Invalidate cache
-            await search_service.invalidate_search_cache(user.id)
-            await cache_service.invalidate_user_cache(user.id)
+            await self._invalidate_user_caches(user.id)
             
             return True
             
@@ -592,17 +745,17 @@ class BulkOperationService:
             for op in reversed(user_stack)  # Most recent first
         ]
     
+    async def _invalidate_user_caches(self, user_id: int):
+        """Drop a user's search and task caches with one batched DEL."""
+        keys = await search_service.search_cache_keys(user_id)
+        await cache_service.invalidate_many(keys + cache_service.user_cache_keys(user_id))
+    
     async def _add_to_undo_stack(self, user_id: int, operation: BulkOperation):
         """Add operation to undo stack."""
-        if user_id not in self._undo_stack:
-            self._undo_stack[user_id] = []
-        
-        stack = self._undo_stack[user_id]
-        stack.append(operation)
-        
-        # Limit stack size
-        if len(stack) > self._max_undo_operations:
-            stack.pop(0)  # Remove oldest
+        # Bounded deque drops the oldest operation once the stack is full
+        self._undo_stack.setdefault(
+            user_id, deque(maxlen=self._max_undo_operations)
+        ).append(operation)
     
     # Task Templates
     async def create_task_template(
@@ -612,7 +765,7 @@ class BulkOperationService:
     ) -> TaskTemplate:
         """Create a task template."""
         template = TaskTemplate(
-            id=str(uuid4()),
+            id=uuid4().hex,
             name=template_data["name"],
             description=template_data.get("description"),
             tasks=template_data["tasks"],
@@ -625,7 +778,7 @@ class BulkOperationService:
         # Cache template
         await cache_service.set(
             f"template_{template.id}",
-            template.dict(),
+            template.to_dict(),
             ttl=86400,  # 24 hours
             prefix="templates:"
         )
@@ -657,12 +810,13 @@ class BulkOperationService:
         # Get user's templates
         user_templates = await cache_service.get(f"user_{user.id}_templates", "templates:")
         if user_templates:
-            for template_id in user_templates:
-                template_data = await cache_service.get(f"template_{template_id}", "templates:")
-                if template_data:
-                    template = TaskTemplate(**template_data)
-                    if not category or template.category == category:
-                        templates.append(template)
+            templates_data = await cache_service.get_many(
+                [f"template_{template_id}" for template_id in user_templates],
+                "templates:"
+            )
+            for template_data in templates_data:
+                if template_data and (not category or template_data.get("category") == category):
+                    templates.append(TaskTemplate.from_dict(template_data))
         
         # TODO: Get public templates (would need database storage)
         
@@ -680,7 +834,7 @@ class BulkOperationService:
         if not template_data:
             raise ValueError("Template not found")
         
-        template = TaskTemplate(**template_data)
+        template = TaskTemplate.from_dict(template_data)
         tasks_data = template.tasks.copy()
         
         # Apply customizations
@@ -1,18 +1,23 @@
 """
 Simplified Redis caching and session management service.
 """
-import json
 import asyncio
-from datetime import datetime, timedelta
+import hashlib
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Any, Optional, Dict, List
 from functools import wraps
 
-import redis
-from fakeredis import FakeRedis
+import orjson
+from redis.asyncio import ConnectionPool, Redis, SSLConnection
 from pydantic import BaseModel
 
 from config import (
     REDIS_URL, REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_SSL,
+    REDIS_MAX_CONNECTIONS, REDIS_HEALTH_CHECK_INTERVAL,
     CACHE_DEFAULT_TTL, CACHE_LONG_TTL, CACHE_SHORT_TTL,
     SESSION_TTL, CACHE_PREFIX, SESSION_PREFIX, RATE_LIMIT_PREFIX, 
     USER_CACHE_PREFIX, TASK_CACHE_PREFIX
@@ -23,39 +28,112 @@ class SessionData(BaseModel):
     user_id: int
     username: str
     role: str
-    created_at: datetime
-    last_accessed: datetime
+    created_at: int  # epoch seconds
+    last_accessed: int  # epoch seconds
     data: Dict[str, Any] = {}
 
+    @property
+    def created_datetime(self) -> datetime:
+        """created_at as a naive UTC datetime."""
+        return datetime.utcfromtimestamp(self.created_at)
+
+    @property
+    def last_accessed_datetime(self) -> datetime:
+        """last_accessed as a naive UTC datetime."""
+        return datetime.utcfromtimestamp(self.last_accessed)
+
+# Keys requested per SCAN call; higher means fewer round trips but longer server time slices
+SCAN_COUNT = 1000
+
+# Keys deleted per UNLINK call
+UNLINK_BATCH_SIZE = 500
+
+# JSON payloads larger than this are stored zlib-compressed under TAG_COMPRESSED
+COMPRESS_MIN_BYTES = 1024
+
+# One-byte type tags prefixed to every value written by set()
+TAG_JSON = b"J"
+TAG_COMPRESSED = b"Z"
+TAG_INT = b"I"
+TAG_STR = b"S"
+
+# Key builders for the per-user task list, without and with its prefix
+_USER_TASKS_KEY = "user_{}_tasks".format
+_USER_TASKS_CACHE_KEY = (TASK_CACHE_PREFIX + "user_{}_tasks").format
+
+# Full key of the hash holding a user's serialized task list responses, one field per page
+_USER_TASK_PAGES_CACHE_KEY = (TASK_CACHE_PREFIX + "user_{}_task_pages").format
+
+# Seconds a session's stored last_accessed may lag before get_session rewrites it
+SESSION_TOUCH_INTERVAL = 60
+
+# Sessions are hashes; each entry of SessionData.data lives in its own field under this prefix
+SESSION_DATA_FIELD_PREFIX = "data:"
+
+# Redis type of the keys under each prefix, for SCAN's TYPE filter; anything unlisted is a string
+# and None means the prefix mixes types (task pages are hashes beside string task entries)
+_PREFIX_KEY_TYPES = {SESSION_PREFIX: "hash", TASK_CACHE_PREFIX: None}
+
+# Most background cache writes allowed in flight; further ones are dropped rather than queued
+MAX_PENDING_WRITES = 256
+
 class SimpleCacheService:
     """Simplified Redis caching service."""
     
+    # One in-memory server for every FakeRedis client in the process, like a shared real Redis;
+    # it also keeps data across reconnects. Created with the first FakeRedis client.
+    _fake_server = None
+    
     def __init__(self, use_fake_redis: bool = False):
         self.use_fake_redis = use_fake_redis
         self._redis = None
         self._connected = False
+        self._loop = None
+        # (event loop, asyncio.Lock) serializing connect(); a lock is bound to one loop like the client
+        self._connect_lock = (None, None)
+        # Background writes started by schedule(), held so they are not garbage collected
+        self._pending = set()
         
     async def connect(self):
-        """Initialize Redis connection."""
-        if self._connected:
+        """Initialize Redis connection; concurrent first callers share one attempt."""
+        # asyncio clients are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._connected and self._loop is loop:
             return
-            
+        
+        if self._connect_lock[0] is not loop:
+            self._connect_lock = (loop, asyncio.Lock())
+        async with self._connect_lock[1]:
+            # Another coroutine may have connected while we waited
+            if self._connected and self._loop is loop:
+                return
+            await self._open(loop)
+    
+    async def _open(self, loop):
+        """Create the client for this event loop, falling back to FakeRedis."""
+        self._loop = loop
         try:
             if self.use_fake_redis:
-                self._redis = FakeRedis(decode_responses=True)
+                self._redis = self._fake_client()
             else:
-                self._redis = redis.Redis(
+                # Shared pool so concurrent coroutines don't queue on one socket
+                pool_kwargs = {"connection_class": SSLConnection} if REDIS_SSL else {}
+                pool = ConnectionPool(
                     host=REDIS_HOST,
                     port=REDIS_PORT,
                     db=REDIS_DB,
                     password=REDIS_PASSWORD,
-                    ssl=REDIS_SSL,
-                    decode_responses=True,
                     socket_connect_timeout=5,
-                    socket_timeout=5
+                    socket_timeout=5,
+                    socket_keepalive=True,
+                    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    **pool_kwargs
                 )
+                # from_pool hands the pool to the client, so aclose() also disconnects it
+                self._redis = Redis.from_pool(pool)
                 # Test connection
-                self._redis.ping()
+                await self._redis.ping()
             
             self._connected = True
             redis_type = "FakeRedis" if self.use_fake_redis else "Redis"
@@ -64,72 +142,154 @@ class SimpleCacheService:
         except Exception as e:
             print(f"⚠️ Redis connection failed, using FakeRedis: {e}")
             self.use_fake_redis = True
-            self._redis = FakeRedis(decode_responses=True)
+            self._redis = self._fake_client()
             self._connected = True
     
+    def _fake_client(self):
+        """Create a FakeRedis client; fakeredis is only imported once one is needed."""
+        from fakeredis import FakeServer
+        from fakeredis.aioredis import FakeRedis
+        
+        if SimpleCacheService._fake_server is None:
+            SimpleCacheService._fake_server = FakeServer()
+        return FakeRedis(server=SimpleCacheService._fake_server)
+    
     async def disconnect(self):
-        """Close Redis connection."""
+        """Close Redis connection, after letting background writes finish."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
         if self._redis and not self.use_fake_redis:
-            self._redis.close()
+            await self._redis.aclose()
         self._connected = False
     
-    async def _run_redis_op(self, operation):
-        """Run Redis operation async-safe."""
-        if not self._connected:
+    async def _client(self) -> Redis:
+        """Get the asyncio Redis client, connecting on first use."""
+        if not self._connected or self._loop is not asyncio.get_running_loop():
             await self.connect()
+        return self._redis
+    
+    async def _scan_iter(self, match: str, key_type: Optional[str] = "string"):
+        """Yield batches of full keys (as bytes) matching a pattern, using SCAN rather than blocking KEYS.
         
-        if self.use_fake_redis:
-            # FakeRedis is synchronous, run in executor
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, operation)
-        else:
-            # Real Redis is synchronous too in this simplified version
-            return operation()
+        Everything outside the session prefix is a string, so SCAN filters on TYPE string by default;
+        pass key_type=None to include keys of any type.
+        """
+        cursor = 0
+        while True:
+            client = await self._client()
+            cursor, keys = await client.scan(cursor, match=match, count=SCAN_COUNT, _type=key_type)
+            if keys:
+                yield keys
+            if not cursor:
+                break
+    
+    async def _unlink(self, keys: List[Any]) -> int:
+        """Remove full keys with UNLINK, which frees memory off the Redis main thread."""
+        client = await self._client()
+        deleted = 0
+        for start in range(0, len(keys), UNLINK_BATCH_SIZE):
+            deleted += await client.unlink(*keys[start:start + UNLINK_BATCH_SIZE])
+        return deleted
     
     def _make_key(self, prefix: str, key: str) -> str:
         """Create prefixed cache key."""
-        return f"{prefix}{key}"
+        return prefix + key
+    
+    def _decode(self, value: bytes) -> Any:
+        """Decode a stored value by its type tag."""
+        tag, payload = value[:1], value[1:]
+        if tag == TAG_JSON:
+            return orjson.loads(payload)
+        if tag == TAG_STR:
+            return payload.decode()
+        if tag == TAG_INT:
+            return int(payload)
+        if tag == TAG_COMPRESSED:
+            return orjson.loads(zlib.decompress(payload))
+        # Untagged value written before type tags were introduced
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return value.decode()
+    
+    def _encode(self, value: Any) -> bytes:
+        """Serialize a value behind its type tag, compressing large JSON.
+        
+        Plain strings and ints are stored as text; everything else (containers, floats, bools,
+        None, datetimes, UUIDs, ...) goes through orjson so its JSON type survives the round trip.
+        """
+        if type(value) is str:
+            return TAG_STR + value.encode()
+        if type(value) is int:
+            return TAG_INT + str(value).encode()
+        serialized_value = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+        if len(serialized_value) > COMPRESS_MIN_BYTES:
+            return TAG_COMPRESSED + zlib.compress(serialized_value, 1)
+        return TAG_JSON + serialized_value
     
     async def set(self, key: str, value: Any, ttl: int = CACHE_DEFAULT_TTL, prefix: str = CACHE_PREFIX) -> bool:
         """Set value in cache."""
         try:
             cache_key = self._make_key(prefix, key)
-            if isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value, default=str)
-            else:
-                serialized_value = str(value)
-            
-            result = await self._run_redis_op(
-                lambda: self._redis.setex(cache_key, ttl, serialized_value)
-            )
+            client = await self._client()
+            await client.setex(cache_key, ttl, self._encode(value))
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
             return False
     
+    def schedule(self, operation) -> bool:
+        """Run a non-critical cache coroutine in the background instead of awaiting it.
+        
+        Returns False, dropping the operation, when MAX_PENDING_WRITES are already in flight.
+        """
+        if len(self._pending) >= MAX_PENDING_WRITES:
+            operation.close()
+            return False
+        task = asyncio.create_task(operation)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+    
+    def set_nowait(self, key: str, value: Any, ttl: int = CACHE_DEFAULT_TTL, prefix: str = CACHE_PREFIX) -> bool:
+        """Schedule set() in the background and return immediately."""
+        return self.schedule(self.set(key, value, ttl, prefix))
+    
     async def get(self, key: str, prefix: str = CACHE_PREFIX) -> Optional[Any]:
         """Get value from cache."""
         try:
             cache_key = self._make_key(prefix, key)
-            value = await self._run_redis_op(lambda: self._redis.get(cache_key))
+            client = await self._client()
+            value = await client.get(cache_key)
             
             if value is None:
                 return None
             
-            # Try JSON decode, fallback to string
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self._decode(value)
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
     
+    async def get_many(self, keys: List[str], prefix: str = CACHE_PREFIX) -> List[Optional[Any]]:
+        """Get several values with a single MGET, in the order of keys."""
+        if not keys:
+            return []
+        try:
+            cache_keys = [self._make_key(prefix, key) for key in keys]
+            client = await self._client()
+            values = await client.mget(cache_keys)
+            
+            return [None if value is None else self._decode(value) for value in values]
+        except Exception as e:
+            print(f"Cache get many error: {e}")
+            return [None] * len(keys)
+    
     async def delete(self, key: str, prefix: str = CACHE_PREFIX) -> bool:
-        """Delete value from cache."""
+        """Delete value from cache with UNLINK, so Redis frees large values off its main thread."""
         try:
             cache_key = self._make_key(prefix, key)
-            result = await self._run_redis_op(lambda: self._redis.delete(cache_key))
+            client = await self._client()
+            result = await client.unlink(cache_key)
             return bool(result)
         except Exception as e:
             print(f"Cache delete error: {e}")
@@ -139,33 +299,71 @@ class SimpleCacheService:
         """Check if key exists."""
         try:
             cache_key = self._make_key(prefix, key)
-            result = await self._run_redis_op(lambda: self._redis.exists(cache_key))
+            client = await self._client()
+            result = await client.exists(cache_key)
             return bool(result)
         except Exception as e:
             print(f"Cache exists error: {e}")
             return False
     
+    async def expire(self, key: str, ttl: int, prefix: str = CACHE_PREFIX) -> bool:
+        """Set expiration for a key."""
+        try:
+            cache_key = self._make_key(prefix, key)
+            client = await self._client()
+            result = await client.expire(cache_key, ttl)
+            return bool(result)
+        except Exception as e:
+            print(f"Cache expire error: {e}")
+            return False
+    
     async def delete_pattern(self, pattern: str, prefix: str = CACHE_PREFIX) -> int:
         """Delete keys matching pattern."""
         try:
             full_pattern = self._make_key(prefix, pattern)
-            keys = await self._run_redis_op(lambda: self._redis.keys(full_pattern))
-            if keys:
-                deleted = await self._run_redis_op(lambda: self._redis.delete(*keys))
-                return deleted
-            return 0
+            deleted = 0
+            async for keys in self._scan_iter(full_pattern, _PREFIX_KEY_TYPES.get(prefix, "string")):
+                deleted += await self._unlink(keys)
+            return deleted
         except Exception as e:
             print(f"Cache delete pattern error: {e}")
             return 0
     
+    async def match_keys(self, patterns: List[str]) -> List[str]:
+        """Get full keys matching any of the given full patterns."""
+        try:
+            matched = set()
+            for pattern in patterns:
+                async for keys in self._scan_iter(pattern):
+                    matched.update(keys)
+            return [key.decode() for key in matched]
+        except Exception as e:
+            print(f"Cache match keys error: {e}")
+            return []
+    
+    async def invalidate_many(self, keys: List[str]) -> int:
+        """Delete several full keys with batched UNLINK calls."""
+        if not keys:
+            return 0
+        try:
+            return await self._unlink(keys)
+        except Exception as e:
+            print(f"Cache invalidate many error: {e}")
+            return 0
+    
     async def get_keys(self, pattern: str = "*", prefix: str = CACHE_PREFIX) -> List[str]:
         """Get keys matching pattern."""
         try:
             full_pattern = self._make_key(prefix, pattern)
-            keys = await self._run_redis_op(lambda: self._redis.keys(full_pattern))
-            # Remove prefix
-            prefix_len = len(prefix)
-            return [key[prefix_len:] for key in keys if key.startswith(prefix)]
+            # Remove prefix, decoding only the part returned
+            prefix_bytes = prefix.encode()
+            prefix_len = len(prefix_bytes)
+            return [
+                key[prefix_len:].decode()
+                async for keys in self._scan_iter(full_pattern, _PREFIX_KEY_TYPES.get(prefix, "string"))
+                for key in keys
+                if key.startswith(prefix_bytes)
+            ]
         except Exception as e:
             print(f"Cache get keys error: {e}")
             return []
@@ -181,14 +379,41 @@ class SimpleCacheService:
     
     async def cache_user_tasks(self, user_id: int, tasks: List[Dict[str, Any]], ttl: int = CACHE_DEFAULT_TTL) -> bool:
         """Cache user tasks."""
-        key = f"user_{user_id}_tasks"
+        key = _USER_TASKS_KEY(user_id)
         return await self.set(key, tasks, ttl, TASK_CACHE_PREFIX)
     
     async def get_user_tasks(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
         """Get user tasks."""
-        key = f"user_{user_id}_tasks"
+        key = _USER_TASKS_KEY(user_id)
         return await self.get(key, TASK_CACHE_PREFIX)
     
+    async def cache_user_tasks_page(self, user_id: int, page: str, body: bytes,
+                                    ttl: int = CACHE_DEFAULT_TTL) -> bool:
+        """Store one serialized task list response under its page field in the user's pages hash.
+        
+        The TTL is only set when the hash is created, so no page outlives the first by more than ttl.
+        """
+        try:
+            key = _USER_TASK_PAGES_CACHE_KEY(user_id)
+            client = await self._client()
+            pipe = client.pipeline()
+            pipe.hset(key, page, body)
+            pipe.expire(key, ttl, nx=True)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
+    
+    async def get_user_tasks_page(self, user_id: int, page: str) -> Optional[bytes]:
+        """Get a serialized task list response, as the exact bytes stored."""
+        try:
+            client = await self._client()
+            return await client.hget(_USER_TASK_PAGES_CACHE_KEY(user_id), page)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return None
+    
     async def cache_task(self, task_id: int, task_data: Dict[str, Any], ttl: int = CACHE_DEFAULT_TTL) -> bool:
         """Cache task data."""
         return await self.set(str(task_id), task_data, ttl, TASK_CACHE_PREFIX)
@@ -197,81 +422,170 @@ class SimpleCacheService:
         """Get task data."""
         return await self.get(str(task_id), TASK_CACHE_PREFIX)
     
+    def user_cache_keys(self, user_id: int) -> List[str]:
+        """Full keys holding a user's data and task lists."""
+        return [
+            self._make_key(USER_CACHE_PREFIX, str(user_id)),
+            _USER_TASKS_CACHE_KEY(user_id),
+            _USER_TASK_PAGES_CACHE_KEY(user_id)
+        ]
+    
     async def invalidate_user_cache(self, user_id: int) -> bool:
         """Invalidate user cache."""
-        # Delete specific user data
-        deleted1 = await self.delete(str(user_id), USER_CACHE_PREFIX)
-        
-        # Delete user's task list
-        user_tasks_key = f"user_{user_id}_tasks"
-        deleted2 = await self.delete(user_tasks_key, TASK_CACHE_PREFIX)
-        
-        return deleted1 or deleted2
+        return bool(await self.invalidate_many(self.user_cache_keys(user_id)))
     
     async def invalidate_task_cache(self, task_id: int, user_id: Optional[int] = None) -> bool:
         """Invalidate task cache."""
-        deleted = await self.delete(str(task_id), TASK_CACHE_PREFIX)
+        keys = [self._make_key(TASK_CACHE_PREFIX, str(task_id))]
         if user_id:
-            user_tasks_key = f"user_{user_id}_tasks"
-            await self.delete(user_tasks_key, TASK_CACHE_PREFIX)
-        return deleted
+            keys.extend((_USER_TASKS_CACHE_KEY(user_id), _USER_TASK_PAGES_CACHE_KEY(user_id)))
+        return bool(await self.invalidate_many(keys))
     
     # Session operations
+    def _session_fields(self, data: Dict[str, Any]) -> Dict[str, bytes]:
+        """Hash fields holding session data, one JSON-encoded field per entry."""
+        return {
+            SESSION_DATA_FIELD_PREFIX + name: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            for name, value in data.items()
+        }
+    
     async def create_session(self, session_id: str, user_id: int, username: str, role: str, 
                              session_data: Dict[str, Any] = None) -> bool:
-        """Create session."""
+        """Create session as a Redis hash."""
+        now = int(time.time())
         session = SessionData(
             user_id=user_id,
             username=username,
             role=role,
-            created_at=datetime.utcnow(),
-            last_accessed=datetime.utcnow(),
+            created_at=now,
+            last_accessed=now,
             data=session_data or {}
         )
-        return await self.set(session_id, session.dict(), SESSION_TTL, SESSION_PREFIX)
+        try:
+            cache_key = self._make_key(SESSION_PREFIX, session_id)
+            client = await self._client()
+            # MULTI/EXEC so the hash never exists without its TTL
+            pipe = client.pipeline()
+            pipe.unlink(cache_key)
+            pipe.hset(cache_key, mapping={
+                "user_id": session.user_id,
+                "username": session.username,
+                "role": session.role,
+                "created_at": session.created_at,
+                "last_accessed": session.last_accessed,
+                **self._session_fields(session.data)
+            })
+            pipe.expire(cache_key, SESSION_TTL)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
     
     async def get_session(self, session_id: str) -> Optional[SessionData]:
-        """Get session."""
-        session_data = await self.get(session_id, SESSION_PREFIX)
-        if not session_data:
+        """Get session and slide its TTL."""
+        try:
+            cache_key = self._make_key(SESSION_PREFIX, session_id)
+            client = await self._client()
+            pipe = client.pipeline(transaction=False)
+            pipe.hgetall(cache_key)
+            pipe.expire(cache_key, SESSION_TTL)
+            fields, _ = await pipe.execute()
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return None
+        
+        if not fields:
             return None
         
         try:
-            # Update last accessed
-            session_data['last_accessed'] = datetime.utcnow().isoformat()
-            await self.set(session_id, session_data, SESSION_TTL, SESSION_PREFIX)
+            data_prefix = SESSION_DATA_FIELD_PREFIX.encode()
+            data_prefix_len = len(data_prefix)
+            data = {
+                name[data_prefix_len:].decode(): orjson.loads(value)
+                for name, value in fields.items()
+                if name.startswith(data_prefix)
+            }
+            # We wrote these fields ourselves, so build the model without re-validating it
+            session = SessionData.model_construct(
+                user_id=int(fields[b"user_id"]),
+                username=fields[b"username"].decode(),
+                role=fields[b"role"].decode(),
+                created_at=int(fields[b"created_at"]),
+                last_accessed=int(fields[b"last_accessed"]),
+                data=data
+            )
             
-            # Parse datetime strings
-            session_data['created_at'] = datetime.fromisoformat(session_data['created_at'])
-            session_data['last_accessed'] = datetime.fromisoformat(session_data['last_accessed'])
+            # Update last accessed; only write the one field back once it is stale
+            now = int(time.time())
+            if now - session.last_accessed >= SESSION_TOUCH_INTERVAL:
+                await client.hset(cache_key, "last_accessed", now)
+            session.last_accessed = now
             
-            return SessionData(**session_data)
+            return session
         except Exception as e:
             print(f"Session parse error: {e}")
             return None
     
     async def update_session(self, session_id: str, data: Dict[str, Any]) -> bool:
-        """Update session."""
-        session = await self.get_session(session_id)
-        if not session:
+        """Update session by writing only the changed data fields and last_accessed."""
+        try:
+            cache_key = self._make_key(SESSION_PREFIX, session_id)
+            client = await self._client()
+            pipe = client.pipeline()
+            pipe.hexists(cache_key, "user_id")
+            pipe.hset(cache_key, mapping={"last_accessed": int(time.time()), **self._session_fields(data)})
+            pipe.expire(cache_key, SESSION_TTL)
+            exists, _, _ = await pipe.execute()
+            if not exists:
+                # The session was gone; drop the partial hash HSET just created
+                await client.unlink(cache_key)
+                return False
+            return True
+        except Exception as e:
+            print(f"Session update error: {e}")
             return False
-        
-        session.data.update(data)
-        session.last_accessed = datetime.utcnow()
-        return await self.set(session_id, session.dict(), SESSION_TTL, SESSION_PREFIX)
     
     async def delete_session(self, session_id: str) -> bool:
         """Delete session."""
         return await self.delete(session_id, SESSION_PREFIX)
     
+    async def cleanup_expired_sessions(self) -> int:
+        """Delete sessions not accessed within SESSION_TTL, one HGET pipeline and one UNLINK per SCAN batch."""
+        try:
+            client = await self._client()
+            cutoff = int(time.time()) - SESSION_TTL
+            expired = 0
+            async for keys in self._scan_iter(SESSION_PREFIX + "*", key_type="hash"):
+                pipe = client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hget(key, "last_accessed")
+                values = await pipe.execute()
+                # A hash without last_accessed is unreadable, so it can never be used again
+                stale = [
+                    key for key, value in zip(keys, values)
+                    if value is None or int(value) < cutoff
+                ]
+                if stale:
+                    expired += await self._unlink(stale)
+            return expired
+        except Exception as e:
+            print(f"Session cleanup error: {e}")
+            return 0
+    
     # Rate limiting
     async def increment_rate_limit(self, key: str, window: int = 60) -> int:
         """Increment rate limit counter."""
         try:
             cache_key = self._make_key(RATE_LIMIT_PREFIX, key)
-            current = await self._run_redis_op(lambda: self._redis.get(cache_key)) or 0
-            current = int(current) + 1
-            await self._run_redis_op(lambda: self._redis.setex(cache_key, window, current))
+            
+            # INCR plus window expiry set only on the first hit, as one MULTI/EXEC round trip
+            # so a counter can never be left behind without its TTL
+            client = await self._client()
+            pipe = client.pipeline()
+            pipe.incr(cache_key)
+            pipe.expire(cache_key, window, nx=True)
+            current, _ = await pipe.execute()
             return current
         except Exception as e:
             print(f"Rate limit error: {e}")
@@ -279,18 +593,29 @@ class SimpleCacheService:
     
     async def get_rate_limit(self, key: str) -> int:
         """Get rate limit count."""
-        result = await self.get(key, RATE_LIMIT_PREFIX)
+        # Counters are raw INCR integers, not tagged values
+        try:
+            client = await self._client()
+            result = await client.get(self._make_key(RATE_LIMIT_PREFIX, key))
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return 0
         return int(result) if result else 0
     
     # Health and stats
     async def health_check(self) -> bool:
         """Check cache health."""
         try:
-            test_key = "health_check"
-            await self.set(test_key, "ok", 10)
-            result = await self.get(test_key)
-            await self.delete(test_key)
-            return result == "ok"
+            test_key = self._make_key(CACHE_PREFIX, "health_check")
+            
+            # Write, read back and delete the probe key in one MULTI/EXEC round trip
+            client = await self._client()
+            pipe = client.pipeline()
+            pipe.setex(test_key, 10, "ok")
+            pipe.get(test_key)
+            pipe.delete(test_key)
+            _, result, _ = await pipe.execute()
+            return result == b"ok"
         except Exception:
             return False
     
@@ -298,18 +623,30 @@ class SimpleCacheService:
         """Get cache stats."""
         try:
             if self.use_fake_redis:
-                all_keys = await self._run_redis_op(lambda: self._redis.keys("*"))
+                # Every prefix ends at its first ":", so each key is bucketed with one dict lookup
+                prefixes = {
+                    CACHE_PREFIX.encode(): "cache_keys",
+                    SESSION_PREFIX.encode(): "session_keys",
+                    USER_CACHE_PREFIX.encode(): "user_cache_keys",
+                    TASK_CACHE_PREFIX.encode(): "task_cache_keys",
+                    RATE_LIMIT_PREFIX.encode(): "rate_limit_keys"
+                }
+                stats = dict.fromkeys(prefixes.values(), 0)
+                total_keys = 0
+                async for keys in self._scan_iter("*", key_type=None):
+                    total_keys += len(keys)
+                    for key in keys:
+                        name = prefixes.get(key[:key.find(b":") + 1])
+                        if name:
+                            stats[name] += 1
                 return {
-                    "total_keys": len(all_keys),
-                    "cache_keys": len([k for k in all_keys if k.startswith(CACHE_PREFIX)]),
-                    "session_keys": len([k for k in all_keys if k.startswith(SESSION_PREFIX)]),
-                    "user_cache_keys": len([k for k in all_keys if k.startswith(USER_CACHE_PREFIX)]),
-                    "task_cache_keys": len([k for k in all_keys if k.startswith(TASK_CACHE_PREFIX)]),
-                    "rate_limit_keys": len([k for k in all_keys if k.startswith(RATE_LIMIT_PREFIX)]),
-                    "redis_type": "FakeRedis"
+                    "total_keys": total_keys,
+                    **stats,
+                    "redis_type": "FakeRedis (Testing/Fallback)"
                 }
             else:
-                info = await self._run_redis_op(lambda: self._redis.info())
+                client = await self._client()
+                info = await client.info()
                 return {
                     "total_keys": info.get("db0", {}).get("keys", 0),
                     "memory_usage": info.get("used_memory_human", "N/A"),
@@ -326,6 +663,82 @@ cache_service = SimpleCacheService(use_fake_redis=True)  # Default to FakeRedis
 # Alias for compatibility
 CacheService = SimpleCacheService
 
+# Context manager for cache lifecycle
+@asynccontextmanager
+async def cache_context():
+    """Connect the cache service once for the app's lifetime, draining and closing it on exit."""
+    await cache_service.connect()
+    try:
+        yield cache_service
+    finally:
+        await cache_service.disconnect()
+
+# In-process first tier for cache_result: full key -> (monotonic expiry, value), least recently used first
+L1_MAX_ENTRIES = 1024
+_l1_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def _l1_get(key: str) -> Optional[Any]:
+    """Get a live value from the in-process tier."""
+    entry = _l1_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _l1_cache[key]
+        return None
+    _l1_cache.move_to_end(key)
+    return value
+
+def _l1_set(key: str, value: Any, ttl: float):
+    """Store a value in the in-process tier, evicting the least recently used entry when full."""
+    _l1_cache[key] = (time.monotonic() + ttl, value)
+    _l1_cache.move_to_end(key)
+    if len(_l1_cache) > L1_MAX_ENTRIES:
+        _l1_cache.popitem(last=False)
+
+# Decorators
+def cache_result(key_func=None, ttl: int = CACHE_DEFAULT_TTL, prefix: str = CACHE_PREFIX, l1_ttl: float = 5):
+    """Cache an async function's result in Redis, fronted by a short-lived in-process tier.
+    
+    Repeated calls within l1_ttl seconds skip Redis entirely, so an invalidation may take up
+    to l1_ttl to be seen by this process; pass l1_ttl=0 to disable the tier. Results served
+    from it are shared objects and must not be mutated.
+    """
+    def decorator(func):
+        key_prefix = func.__name__ + ":"
+        
+        def default_key(*args, **kwargs) -> str:
+            # blake2b is stable across processes, unlike hash()
+            digest = hashlib.blake2b(repr(args).encode(), digest_size=12)
+            digest.update(repr(kwargs).encode())
+            return key_prefix + digest.hexdigest()
+        
+        # Pick the key builder once here rather than branching on every call
+        build_key = key_func or default_key
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = build_key(*args, **kwargs)
+            l1_key = prefix + cache_key
+            
+            if l1_ttl:
+                result = _l1_get(l1_key)
+                if result is not None:
+                    return result
+            
+            result = await cache_service.get(cache_key, prefix)
+            if result is None:
+                result = await func(*args, **kwargs)
+                if result is None:
+                    return None
+                cache_service.set_nowait(cache_key, result, ttl, prefix)
+            
+            if l1_ttl:
+                _l1_set(l1_key, result, l1_ttl)
+            return result
+        return wrapper
+    return decorator
+
 # Helper functions
 async def invalidate_user_data(user_id: int):
     """Invalidate user data."""
@@ -1,3 +1,4 @@
+# decouple locates and parses .env once, on the first config() call; each setting is cast as it is read
 from decouple import config
 from datetime import timedelta
 
@@ -8,7 +9,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 # Security Configuration
-BCRYPT_ROUNDS = 12
+BCRYPT_ROUNDS = config("BCRYPT_ROUNDS", default=12, cast=int)
+BCRYPT_MAX_WORKERS = config("BCRYPT_MAX_WORKERS", default=0, cast=int)  # 0 = one per CPU core
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 30
 
@@ -29,6 +31,11 @@ CORS_ORIGINS = [
 
 # Database settings
 DATABASE_URL = config("DATABASE_URL", default="sqlite:///./todos.db")
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=20, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=40, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=int)  # seconds to wait for a free connection
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)  # seconds; 30 minutes
 
 # API Security settings
 API_KEY_PREFIX = "todo_"
@@ -68,19 +75,21 @@ OAUTH_STATE_SECRET = config("OAUTH_STATE_SECRET", default="oauth-state-secret-ch
 # Redis Configuration
 REDIS_URL = config("REDIS_URL", default="redis://localhost:6379/0")
 REDIS_HOST = config("REDIS_HOST", default="localhost")
-REDIS_PORT = int(config("REDIS_PORT", default="6379"))
-REDIS_DB = int(config("REDIS_DB", default="0"))
+REDIS_PORT = config("REDIS_PORT", default=6379, cast=int)
+REDIS_DB = config("REDIS_DB", default=0, cast=int)
 REDIS_PASSWORD = config("REDIS_PASSWORD", default=None)
-REDIS_SSL = config("REDIS_SSL", default="false").lower() == "true"
+REDIS_SSL = config("REDIS_SSL", default=False, cast=bool)
+REDIS_MAX_CONNECTIONS = config("REDIS_MAX_CONNECTIONS", default=32, cast=int)
+REDIS_HEALTH_CHECK_INTERVAL = config("REDIS_HEALTH_CHECK_INTERVAL", default=30, cast=int)  # seconds
 
 # Cache Configuration
-CACHE_DEFAULT_TTL = int(config("CACHE_DEFAULT_TTL", default="300"))  # 5 minutes
-CACHE_LONG_TTL = int(config("CACHE_LONG_TTL", default="3600"))  # 1 hour
-CACHE_SHORT_TTL = int(config("CACHE_SHORT_TTL", default="60"))  # 1 minute
+CACHE_DEFAULT_TTL = config("CACHE_DEFAULT_TTL", default=300, cast=int)  # 5 minutes
+CACHE_LONG_TTL = config("CACHE_LONG_TTL", default=3600, cast=int)  # 1 hour
+CACHE_SHORT_TTL = config("CACHE_SHORT_TTL", default=60, cast=int)  # 1 minute
 
 # Session Configuration
-SESSION_TTL = int(config("SESSION_TTL", default="86400"))  # 24 hours
-SESSION_CLEANUP_INTERVAL = int(config("SESSION_CLEANUP_INTERVAL", default="3600"))  # 1 hour
+SESSION_TTL = config("SESSION_TTL", default=86400, cast=int)  # 24 hours
+SESSION_CLEANUP_INTERVAL = config("SESSION_CLEANUP_INTERVAL", default=3600, cast=int)  # 1 hour
 
 # Rate Limiting Storage
 RATE_LIMIT_STORAGE_URL = config("RATE_LIMIT_STORAGE_URL", default=REDIS_URL)
@@ -1,12 +1,46 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_PRE_PING, DB_POOL_RECYCLE
+)
+
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+# In-memory SQLite uses a SingletonThreadPool, which takes no size, overflow or timeout
+_is_memory_sqlite = _is_sqlite and (
+    _url.database in (None, "", ":memory:") or _url.query.get("mode") == "memory"
+)
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./todos.db"
+_queue_pool_args = {} if _is_memory_sqlite else {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT
+}
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    query_cache_size=1200,  # room for every hot statement's compiled SQL
+    pool_pre_ping=DB_POOL_PRE_PING,  # drop connections the server closed while idle
+    pool_recycle=DB_POOL_RECYCLE,
+    **_queue_pool_args
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+def get_db():
+    """Yield a session for the current request.
+
+    Every route and auth dependency must depend on this one function so that
+    FastAPI's per-request dependency cache hands them all the same session.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
\ No newline at end of file
@@ -1,20 +1,24 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, delete, func, update
+from sqlalchemy.orm import Session, raiseload, selectinload
 from typing import List, Optional
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+import orjson
 import models
 import schemas
-from database import SessionLocal, engine
+from database import engine, get_db
 from routers import auth as auth_router
 from routers import security as security_router
 from routers import oauth as oauth_router
 from routers import cache as cache_router
 from routers import search as search_router
 from routers import bulk as bulk_router
-from auth import get_current_user, get_current_active_user, check_user_role
+from auth import get_current_user, get_current_active_user, check_user_role, task_scope
 from config import CORS_ORIGINS
 from security import (
     SecurityMiddleware, limiter, rate_limit_api, rate_limit_public,
@@ -28,12 +32,11 @@ models.Base.metadata.create_all(bind=engine)
 
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown."""
-    # Startup
-    await cache_service.connect()
-    print("🚀 Application startup complete")
-    yield
-    # Shutdown
-    await cache_service.disconnect()
+    # Startup: connect the cache once, up front, instead of on the first request
+    async with cache_context():
+        print("🚀 Application startup complete")
+        yield
+    # Shutdown: background cache writes are drained before the client closes
     print("🛑 Application shutdown complete")
 
 app = FastAPI(
@@ -41,6 +44,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",  # Swagger UI
     redoc_url="/redoc",  # ReDoc
+    default_response_class=ORJSONResponse,  # orjson encodes large task lists far faster than json
     lifespan=lifespan
 )
 
@@ -71,13 +75,6 @@ app.include_router(cache_router.router)
 app.include_router(search_router.router)
 app.include_router(bulk_router.router)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @app.get("/")
 @rate_limit_public()
 def read_root(request: Request):
@@ -99,52 +96,42 @@ async def get_tasks(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    # Create cache key based on user and filters
-    cache_key = f"user_{current_user.id}_tasks_{skip}_{limit}_{completed}_{priority}"
+    # Non-admin list responses are cached as the final JSON bytes, one hash field per page
+    cache_page = f"{skip}:{limit}:{completed}:{priority}" if current_user.role != "admin" else None
     
-    # Try to get from cache first
-    cached_tasks = await cache_service.get_user_tasks(current_user.id) if skip == 0 and not completed and not priority else None
+    if cache_page:
+        cached_body = await cache_service.get_user_tasks_page(current_user.id, cache_page)
+        if cached_body is not None:
+            # Served as stored: no ORM hydration, validation or re-encoding on a hit
+            return Response(content=cached_body, media_type="application/json")
     
-    if cached_tasks is None:
-        # Query database
-        query = db.query(models.Task)
-        
-        # Filter by user unless admin
-        if current_user.role != "admin":
-            query = query.filter(models.Task.user_id == current_user.id)
-        
-        if completed is not None:
-            query = query.filter(models.Task.completed == completed)
-        
-        if priority:
-            query = query.filter(models.Task.priority == priority)
-        
-        tasks = query.offset(skip).limit(limit).all()
-        
-        # Convert to dict for caching
-        tasks_data = [
-            {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "completed": task.completed,
-                "priority": task.priority,
-                "due_date": task.due_date.isoformat() if task.due_date else None,
-                "user_id": task.user_id,
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            }
-            for task in tasks
-        ]
-        
-        # Cache simple user tasks (no filters)
-        if skip == 0 and not completed and not priority and current_user.role != "admin":
-            await cache_service.cache_user_tasks(current_user.id, tasks_data, 300)  # 5 minutes
-        
+    # Query database; owners (part of schemas.Task) load in one extra SELECT and any
+    # other relationship access raises instead of issuing a query per task
+    query = db.query(models.Task).options(
+        selectinload(models.Task.owner),
+        raiseload("*")
+    )
+    
+    query = query.filter(task_scope(current_user))
+    
+    if completed is not None:
+        query = query.filter(models.Task.completed == completed)
+    
+    if priority:
+        query = query.filter(models.Task.priority == priority)
+    
+    # The session is synchronous; run the query in the threadpool, off the event loop
+    tasks = await run_in_threadpool(query.offset(skip).limit(limit).all)
+    
+    if not cache_page:
         return tasks
-    else:
-        # Return cached data as Pydantic models
-        return [schemas.Task(**task_data) for task_data in cached_tasks]
+    
+    body = orjson.dumps([schemas.Task.model_validate(task).model_dump() for task in tasks])
+    # Written in the background; the response doesn't wait on Redis
+    cache_service.schedule(
+        cache_service.cache_user_tasks_page(current_user.id, cache_page, body, 300)  # 5 minutes
+    )
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/tasks", response_model=schemas.Task)
 @rate_limit_api()
@@ -154,10 +141,15 @@ async def create_task(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_task = models.Task(**task.dict(), user_id=current_user.id)
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    def insert_task():
+        db_task = models.Task(**task.dict(), user_id=current_user.id)
+        db.add(db_task)
+        db.commit()
+        db.refresh(db_task)
+        return db_task
+    
+    # Blocking database work runs in the threadpool so the event loop stays free
+    db_task = await run_in_threadpool(insert_task)
     
     # Invalidate user's task cache and search cache
     await invalidate_user_data(current_user.id)
@@ -183,6 +175,12 @@ def get_task(
     
     return task
 
+def _raise_task_not_accessible(db: Session, task_id: int, action: str):
+    """Raise 404 or 403 after a guarded UPDATE/DELETE matched no row."""
+    if db.query(models.Task.id).filter(models.Task.id == task_id).first() is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    raise HTTPException(status_code=403, detail=f"Not authorized to {action} this task")
+
 @app.put("/api/tasks/{task_id}", response_model=schemas.Task)
 @rate_limit_api()
 async def update_task(
@@ -192,19 +190,21 @@ async def update_task(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check permissions
-    if current_user.role != "admin" and db_task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this task")
-    
-    for key, value in task.dict(exclude_unset=True).items():
-        setattr(db_task, key, value)
+    def apply_update():
+        # Permission check, update and fetch in one UPDATE ... RETURNING
+        stmt = update(models.Task).where(models.Task.id == task_id, task_scope(current_user))
+        stmt = stmt.values(**task.dict(exclude_unset=True)).returning(models.Task)
+        db_task = db.execute(stmt.execution_options(synchronize_session=False)).scalar_one_or_none()
+        if db_task is None:
+            _raise_task_not_accessible(db, task_id, "update")
+        
+        # Build the response before commit expires the row; the owner comes from the identity map
+        updated = schemas.Task.model_validate(db_task)
+        db.commit()
+        return updated
     
-    db.commit()
-    db.refresh(db_task)
+    # Blocking database work runs in the threadpool so the event loop stays free
+    db_task = await run_in_threadpool(apply_update)
     
     # Invalidate cache and search cache
     await invalidate_task_data(task_id, db_task.user_id)
@@ -214,14 +214,17 @@ async def update_task(
 
 @app.patch("/api/tasks/{task_id}", response_model=schemas.Task)
 @rate_limit_api()
-def patch_task(
+async def patch_task(
     request: Request,
     task_id: int,
     task: schemas.TaskUpdate,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    return update_task(task_id, task, current_user, db)
+    # TaskUpdate fields are all optional, so PUT already applies only what was sent
+    return await update_task(
+        request=request, task_id=task_id, task=task, current_user=current_user, db=db
+    )
 
 @app.delete("/api/tasks/{task_id}")
 @rate_limit_api()
@@ -231,17 +234,20 @@ async def delete_task(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check permissions
-    if current_user.role != "admin" and db_task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this task")
+    def apply_delete():
+        # Permission check and delete in one DELETE ... RETURNING
+        stmt = delete(models.Task).where(models.Task.id == task_id, task_scope(current_user))
+        deleted = db.execute(
+            stmt.returning(models.Task.user_id).execution_options(synchronize_session=False)
+        ).first()
+        if deleted is None:
+            _raise_task_not_accessible(db, task_id, "delete")
+        
+        db.commit()
+        return deleted.user_id
     
-    user_id = db_task.user_id
-    db.delete(db_task)
-    db.commit()
+    # Blocking database work runs in the threadpool so the event loop stays free
+    user_id = await run_in_threadpool(apply_delete)
     
     # Invalidate cache and search cache
     await invalidate_task_data(task_id, user_id)
@@ -256,14 +262,13 @@ def get_stats(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Task)
-    
-    # Filter by user unless admin
-    if current_user.role != "admin":
-        query = query.filter(models.Task.user_id == current_user.id)
+    # One aggregate query returns both counts
+    query = db.query(
+        func.count(models.Task.id),
+        func.coalesce(func.sum(case((models.Task.completed == True, 1), else_=0)), 0)
+    ).filter(task_scope(current_user))
     
-    total_tasks = query.count()
-    completed_tasks = query.filter(models.Task.completed == True).count()
+    total_tasks, completed_tasks = query.one()
     active_tasks = total_tasks - completed_tasks
     
     return {
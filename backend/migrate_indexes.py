@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Database migration script to create indexes declared on the models.
+"""
+from database import Base, engine
+import models
+
+def migrate_indexes():
+    """Create any model index that is missing from an existing database."""
+    print("Starting index migration...")
+
+    # Create all new tables (won't affect existing ones)
+    Base.metadata.create_all(bind=engine)
+
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+            print(f"Index {index.name} on {table.name} is present")
+
+    print("Index migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate_indexes()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the position column to the tasks table.
+"""
+from sqlalchemy import text
+from database import Base, engine
+import models
+
+def migrate_task_position():
+    """Add tasks.position and its (user_id, position) index."""
+    print("Starting task position migration...")
+
+    # Create all new tables (won't affect existing ones)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT COUNT(*)
+            FROM pragma_table_info('tasks')
+            WHERE name='position'
+        """))
+
+        if result.scalar() == 0:
+            print("Adding position column to tasks table...")
+            try:
+                conn.execute(text("ALTER TABLE tasks ADD COLUMN position INTEGER NOT NULL DEFAULT 0"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_tasks_user_position ON tasks (user_id, position)"
+                ))
+                conn.commit()
+                print("position column added to tasks")
+            except Exception as e:
+                print(f"Error adding position to tasks: {e}")
+                conn.rollback()
+                raise
+        else:
+            print("position column already exists on tasks")
+
+    print("Task position migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate_task_position()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add SHA-256 token_hash columns to token tables.
+"""
+import hashlib
+from sqlalchemy import text
+from database import Base, engine
+import models
+
+TOKEN_TABLES = ("refresh_tokens", "blacklisted_tokens")
+
+def migrate_token_hash():
+    """Add and backfill token_hash on refresh_tokens and blacklisted_tokens."""
+    print("Starting token hash migration...")
+
+    # Create all new tables (won't affect existing ones)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        for table in TOKEN_TABLES:
+            result = conn.execute(text(f"""
+                SELECT COUNT(*)
+                FROM pragma_table_info('{table}')
+                WHERE name='token_hash'
+            """))
+
+            if result.scalar() == 0:
+                print(f"Adding token_hash column to {table} table...")
+                try:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN token_hash BLOB"))
+                    conn.execute(text(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_token_hash ON {table} (token_hash)"
+                    ))
+
+                    # Backfill hashes for existing tokens
+                    rows = conn.execute(text(f"SELECT id, token FROM {table}")).fetchall()
+                    for row in rows:
+                        conn.execute(
+                            text(f"UPDATE {table} SET token_hash = :token_hash WHERE id = :id"),
+                            {"token_hash": hashlib.sha256(row.token.encode()).digest(), "id": row.id}
+                        )
+
+                    conn.commit()
+                    print(f"token_hash column added to {table} ({len(rows)} rows backfilled)")
+                except Exception as e:
+                    print(f"Error adding token_hash to {table}: {e}")
+                    conn.rollback()
+                    raise
+            else:
+                print(f"token_hash column already exists on {table}")
+
+    print("Token hash migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate_token_hash()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, UniqueConstraint, LargeBinary, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -67,17 +67,25 @@ class Task(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    position = Column(Integer, nullable=False, default=0, server_default="0")  # Drag-and-drop order, set by reorder_tasks
     
     # Relationships
     owner = relationship("User", back_populates="tasks")
+    
+    __table_args__ = (
+        Index("ix_tasks_user_position", "user_id", "position"),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_user_completed_priority", "user_id", "completed", "priority"),  # get_tasks/get_stats filters
+    )
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String(500), unique=True, index=True, nullable=False)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=True)  # SHA-256 of token, used for lookups
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Range-scanned by cleanup_expired_tokens
     revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=func.now())
     
@@ -89,5 +97,6 @@ class BlacklistedToken(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String(500), unique=True, index=True, nullable=False)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=True)  # SHA-256 of token, used for lookups
     blacklisted_at = Column(DateTime, default=func.now())
-    expires_at = Column(DateTime, nullable=False)
\ No newline at end of file
+    expires_at = Column(DateTime, nullable=False, index=True)  # Range-scanned by cleanup and blacklist reload
\ No newline at end of file
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
@@ -10,9 +9,9 @@ from database import SessionLocal
 from auth import (
     get_db, get_password_hash, authenticate_user, create_access_token,
     create_refresh_token, verify_token, revoke_refresh_token, blacklist_token,
-    security, get_current_user, cleanup_expired_tokens
+    security, get_current_user, cleanup_expired_tokens, JWT_KEY, hash_token
 )
-from config import ACCESS_TOKEN_EXPIRE_DELTA, SECRET_KEY, ALGORITHM
+from config import ACCESS_TOKEN_EXPIRE_DELTA, ALGORITHM
 from jose import JWTError, jwt
 from security import rate_limit_auth, rate_limit_api, security_logger
 
@@ -118,7 +117,7 @@ def refresh_token(
     """Refresh access token using refresh token."""
     # Find refresh token in database
     db_token = db.query(models.RefreshToken).filter(
-        models.RefreshToken.token == refresh_request.refresh_token,
+        models.RefreshToken.token_hash == hash_token(refresh_request.refresh_token),
         models.RefreshToken.revoked == False
     ).first()
     
@@ -143,9 +142,8 @@ def refresh_token(
             detail="User not found or inactive"
         )
     
-    # Revoke old refresh token
+    # Revoke old refresh token; committed together with the new one below
     db_token.revoked = True
-    db.commit()
     
     # Create new tokens
     access_token_data = {
@@ -166,18 +164,16 @@ def refresh_token(
 @rate_limit_api()
 def logout(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: str = Depends(security),
     db: Session = Depends(get_db)
 ):
     """Logout user by blacklisting the access token."""
-    token = credentials.credentials
-    
     try:
         # Verify token and get expiration
         token_data = verify_token(token, db)
         
-        # Blacklist the token
-        blacklist_token(token, token_data.exp, db)
+        # Blacklist the token until it would have expired anyway
+        blacklist_token(token, datetime.utcfromtimestamp(token_data.exp), db)
         
         return {"message": "Successfully logged out"}
     except Exception as e:
@@ -234,18 +230,18 @@ def confirm_password_reset(
     """Reset password using reset token."""
     try:
         # Decode reset token
-        payload = jwt.decode(reset_confirm.token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(reset_confirm.token, JWT_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
         purpose = payload.get("purpose")
         
-        if purpose != "password_reset":
+        if purpose != "password_reset" or not str(user_id).isdigit():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid reset token"
             )
         
         # Get user and update password
-        user = db.query(models.User).filter(models.User.id == user_id).first()
+        user = db.get(models.User, int(user_id))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -6,14 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, validator
 
-from database import SessionLocal
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from database import get_db
 from auth import get_current_active_user, check_user_role
 from models import User
 from bulk_operations import bulk_service, BulkOperationType, TaskTemplate
@@ -211,8 +211,8 @@ async def get_session_info(
         "user_id": session.user_id,
         "username": session.username,
         "role": session.role,
-        "created_at": session.created_at,
-        "last_accessed": session.last_accessed,
+        "created_at": session.created_datetime,
+        "last_accessed": session.last_accessed_datetime,
         "session_data": session.data
     }
 
@@ -148,6 +148,7 @@ class Task(TaskBase):
     user_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+    position: int = 0
     owner: Optional[User] = None
 
     class Config:
@@ -15,6 +15,7 @@ from sqlalchemy.types import Date
 
 from models import Task, User
 from cache import cache_service
+from auth import task_scope
 
 
 class SortOrder(str, Enum):
@@ -29,6 +30,7 @@ class SortField(str, Enum):
     TITLE = "title"
     PRIORITY = "priority"
     COMPLETED = "completed"
+    POSITION = "position"
 
 
 @dataclass
@@ -190,11 +192,8 @@ class SearchService:
                 return SearchResult(**cached_result)
         
         # Build base query
-        query = db.query(Task)
-        
         # Apply user scope (non-admin users only see their tasks)
-        if user.role != "admin":
-            query = query.filter(Task.user_id == user.id)
+        query = db.query(Task).filter(task_scope(user))
         
         # Apply filters
         query = self._apply_filters(query, filters)
@@ -305,10 +304,8 @@ class SearchService:
         
         # Query for matching titles
         title_query = db.query(Task.title).filter(
-            Task.title.ilike(query_pattern)
+            Task.title.ilike(query_pattern), task_scope(user)
         )
-        if user.role != "admin":
-            title_query = title_query.filter(Task.user_id == user.id)
         
         titles = title_query.distinct().limit(limit).all()
         for (title,) in titles:
@@ -317,10 +314,8 @@ class SearchService:
         
         # Extract words from descriptions
         desc_query = db.query(Task.description).filter(
-            Task.description.ilike(query_pattern)
+            Task.description.ilike(query_pattern), task_scope(user)
         )
-        if user.role != "admin":
-            desc_query = desc_query.filter(Task.user_id == user.id)
         
         descriptions = desc_query.distinct().limit(limit * 2).all()
         for (desc,) in descriptions:
@@ -354,23 +349,18 @@ class SearchService:
         if cached_stats:
             return cached_stats
         
-        # Base query for user's tasks
-        base_query = db.query(Task)
-        if user.role != "admin":
-            base_query = base_query.filter(Task.user_id == user.id)
-        
         # Get priority distribution
         priority_stats = db.query(
             Task.priority,
             func.count(Task.id).label('count')
-        ).filter(Task.user_id == user.id if user.role != "admin" else True)\
+        ).filter(task_scope(user))\
          .group_by(Task.priority).all()
         
         # Get completion statistics
         completion_stats = db.query(
             Task.completed,
             func.count(Task.id).label('count')
-        ).filter(Task.user_id == user.id if user.role != "admin" else True)\
+        ).filter(task_scope(user))\
          .group_by(Task.completed).all()
         
         # Get date ranges
@@ -379,7 +369,7 @@ class SearchService:
             func.max(Task.created_at).label('max_created'),
             func.min(Task.due_date).label('min_due'),
             func.max(Task.due_date).label('max_due')
-        ).filter(Task.user_id == user.id if user.role != "admin" else True).first()
+        ).filter(task_scope(user)).first()
         
         stats = {
             "priorities": {priority: count for priority, count in priority_stats},
@@ -403,17 +393,17 @@ class SearchService:
         
         return stats
     
+    async def search_cache_keys(self, user_id: int) -> List[str]:
+        """Get the search, suggestion and stats keys cached for a user."""
+        # "*user_{id}*" also covers keys starting with "user_{id}_"
+        return await cache_service.match_keys([
+            f"{prefix}*user_{user_id}*"
+            for prefix in ("search:", "suggestions:", "stats:")
+        ])
+    
     async def invalidate_search_cache(self, user_id: int):
         """Invalidate search-related cache for a user."""
-        patterns = [
-            f"user_{user_id}_*",
-            f"*user_{user_id}*"
-        ]
-        
-        for pattern in patterns:
-            await cache_service.delete_pattern(pattern, "search:")
-            await cache_service.delete_pattern(pattern, "suggestions:")
-            await cache_service.delete_pattern(pattern, "stats:")
+        await cache_service.invalidate_many(await self.search_cache_keys(user_id))
 
 
 # Global search service instance
@@ -2,10 +2,13 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from datetime import datetime, timedelta
 from database import Base
 from main import app, get_db
 import models
-from auth import get_password_hash
+import auth
+from auth import get_password_hash, cleanup_expired_tokens
+from security import limiter
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -46,6 +49,12 @@ def test_user():
     db.commit()
     db.close()
 
+@pytest.fixture
+def reset_rate_limits():
+    """Clear rate limit counters so earlier tests' logins don't exhaust the 5/minute login limit."""
+    limiter.reset()
+    yield
+
 @pytest.fixture
 def auth_headers(test_user):
     """Get authentication headers for test user."""
@@ -232,4 +241,95 @@ def test_task_isolation(test_user, auth_headers):
     # List tasks should not include other user's tasks
     response = client.get("/api/tasks", headers=other_headers)
     assert response.status_code == 200
-    assert len(response.json()) == 0
\ No newline at end of file
+    assert len(response.json()) == 0
+
+def test_cleanup_expired_tokens(test_user):
+    """Test that expired refresh and blacklisted tokens are removed."""
+    db = TestingSessionLocal()
+    now = datetime.utcnow()
+    db.add_all([
+        models.RefreshToken(token="expired-refresh", user_id=test_user.id, expires_at=now - timedelta(days=1)),
+        models.RefreshToken(token="live-refresh", user_id=test_user.id, expires_at=now + timedelta(days=1)),
+        models.BlacklistedToken(token="expired-blacklisted", expires_at=now - timedelta(days=1)),
+        models.BlacklistedToken(token="live-blacklisted", expires_at=now + timedelta(days=1)),
+    ])
+    db.commit()
+    
+    try:
+        cleanup_expired_tokens(db)
+        
+        refresh_tokens = {t.token for t in db.query(models.RefreshToken).filter(
+            models.RefreshToken.token.in_(["expired-refresh", "live-refresh"])
+        )}
+        blacklisted_tokens = {t.token for t in db.query(models.BlacklistedToken).filter(
+            models.BlacklistedToken.token.in_(["expired-blacklisted", "live-blacklisted"])
+        )}
+        assert refresh_tokens == {"live-refresh"}
+        assert blacklisted_tokens == {"live-blacklisted"}
+    finally:
+        db.query(models.RefreshToken).filter(models.RefreshToken.token == "live-refresh").delete()
+        db.query(models.BlacklistedToken).filter(models.BlacklistedToken.token == "live-blacklisted").delete()
+        db.commit()
+        db.close()
+
+def test_login_unknown_user_runs_dummy_verify(monkeypatch, reset_rate_limits):
+    """Test that unknown users still pay for exactly one bcrypt verify."""
+    calls = []
+    original_verify = auth.verify_password
+    
+    def spy_verify(plain_password, hashed_password):
+        calls.append(hashed_password)
+        return original_verify(plain_password, hashed_password)
+    
+    monkeypatch.setattr(auth, "verify_password", spy_verify)
+    
+    response = client.post(
+        "/api/auth/login",
+        json={"username": "nosuchuser", "password": "WrongPassword123!"}
+    )
+    assert response.status_code == 401
+    assert calls == [auth._DUMMY_HASH]
+
+def test_login_by_email(test_user, reset_rate_limits):
+    """Test login using the email address as identifier."""
+    response = client.post(
+        "/api/auth/login",
+        json={"username": "test@example.com", "password": "TestPass123!@#"}
+    )
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+def test_login_username_containing_at_sign(reset_rate_limits):
+    """Test that a username containing '@' falls back to the username lookup."""
+    db = TestingSessionLocal()
+    user = models.User(
+        email="atsign@example.com",
+        username="at@sign",
+        hashed_password=get_password_hash("TestPass123!@#"),
+        role="user",
+        is_active=True,
+        is_verified=True
+    )
+    db.add(user)
+    db.commit()
+    
+    try:
+        response = client.post(
+            "/api/auth/login",
+            json={"username": "at@sign", "password": "TestPass123!@#"}
+        )
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+def test_login_unknown_email(reset_rate_limits):
+    """Test login with an email that does not exist."""
+    response = client.post(
+        "/api/auth/login",
+        json={"username": "nobody@example.com", "password": "TestPass123!@#"}
+    )
+    assert response.status_code == 401
+    assert "Incorrect username or password" in response.json()["detail"]
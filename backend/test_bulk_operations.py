@@ -486,6 +486,110 @@ class TestBulkService:
         assert operation.progress_percentage == 100.0
         assert operation.is_completed
 
+    @pytest.mark.asyncio
+    async def test_bulk_create_tasks_skips_unknown_fields(self, test_user, setup_database):
+        """Test bulk creation inserts valid rows and fails rows with unknown fields."""
+        db = TestingSessionLocal()
+        try:
+            operation_id, created_tasks = await bulk_service.bulk_create_tasks(
+                db,
+                test_user,
+                [
+                    {"title": "Batch 1", "priority": "high"},
+                    {"title": "Batch 2", "description": "Second"},
+                    {"title": "Batch 3", "not_a_column": True},
+                    # Task columns outside TaskCreate are rejected too, not mixed into the batch
+                    {"title": "Batch 4", "position": 7},
+                    {"title": "Batch 5", "id": 9999, "created_at": "yesterday"},
+                    {"title": "Batch 6", "completed": True}
+                ]
+            )
+
+            assert [task["title"] for task in created_tasks] == ["Batch 1", "Batch 2", "Batch 6"]
+            assert all(task["id"] and task["user_id"] == test_user.id for task in created_tasks)
+            assert created_tasks[1]["priority"] == "medium"
+            assert created_tasks[2]["completed"] is True
+            assert all(task["id"] != 9999 for task in created_tasks)
+
+            operation = await bulk_service.get_operation_status(operation_id)
+            assert operation.processed_items == 6
+            assert operation.failed_items == 3
+
+            db.query(Task).filter(Task.id.in_([task["id"] for task in created_tasks])).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    @pytest.mark.asyncio
+    async def test_reorder_tasks_sets_positions(self, test_user, setup_database):
+        """Test reordering writes each task's new position, and an empty reorder is a no-op."""
+        db = TestingSessionLocal()
+        try:
+            _, created_tasks = await bulk_service.bulk_create_tasks(
+                db,
+                test_user,
+                [{"title": "Reorder 1"}, {"title": "Reorder 2"}]
+            )
+            first_id, second_id = [task["id"] for task in created_tasks]
+            
+            operation_id = await bulk_service.reorder_tasks(
+                db,
+                test_user,
+                [{"id": first_id, "position": 1}, {"id": second_id, "position": 0}]
+            )
+            operation = await bulk_service.get_operation_status(operation_id)
+            assert operation.processed_items == 2
+            
+            db.expire_all()
+            positions = dict(
+                db.query(Task.id, Task.position).filter(Task.id.in_([first_id, second_id])).all()
+            )
+            assert positions == {first_id: 1, second_id: 0}
+            
+            operation_id = await bulk_service.reorder_tasks(db, test_user, [])
+            operation = await bulk_service.get_operation_status(operation_id)
+            assert operation.processed_items == 0
+            assert operation.failed_items == 0
+            
+            db.query(Task).filter(Task.id.in_([first_id, second_id])).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    @pytest.mark.asyncio
+    async def test_undo_update_and_delete_restore_tasks(self, test_user, setup_database):
+        """Test undo restores changed fields after an update and rows after a delete."""
+        db = TestingSessionLocal()
+        try:
+            _, created_tasks = await bulk_service.bulk_create_tasks(
+                db,
+                test_user,
+                [
+                    {"title": "Undo 1", "priority": "high", "due_date": datetime(2030, 1, 1)},
+                    {"title": "Undo 2", "priority": "low"}
+                ]
+            )
+            task_ids = [task["id"] for task in created_tasks]
+
+            await bulk_service.bulk_update_tasks(db, test_user, task_ids, {"priority": "medium"})
+            assert await bulk_service.undo_operation(db, test_user)
+            db.expire_all()
+            priorities = [task.priority for task in db.query(Task).filter(Task.id.in_(task_ids)).order_by(Task.id)]
+            assert priorities == ["high", "low"]
+
+            await bulk_service.bulk_delete_tasks(db, test_user, task_ids)
+            assert db.query(Task).filter(Task.id.in_(task_ids)).count() == 0
+            assert await bulk_service.undo_operation(db, test_user)
+            restored = db.query(Task).filter(Task.user_id == test_user.id, Task.title.like("Undo %")).all()
+            assert sorted(task.title for task in restored) == ["Undo 1", "Undo 2"]
+            assert any(task.due_date == datetime(2030, 1, 1) for task in restored)
+
+            for task in restored:
+                db.delete(task)
+            db.commit()
+        finally:
+            db.close()
+
 class TestKeyboardShortcuts:
     """Test keyboard shortcuts support."""
     
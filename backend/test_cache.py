@@ -6,22 +6,10 @@ import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
-from cache import CacheService, CacheConfig, SessionData
+from cache import CacheService, SessionData
 from session import SessionManager
 import models
 
-@pytest.fixture
-def cache_config():
-    """Test cache configuration."""
-    return CacheConfig(
-        host="localhost",
-        port=6379,
-        db=1,  # Use different DB for testing
-        default_ttl=60,
-        long_ttl=300,
-        short_ttl=30
-    )
-
 @pytest.fixture
 async def cache_service():
     """Test cache service with FakeRedis."""
@@ -69,6 +57,57 @@ class TestCacheService:
         assert not await cache_service.exists("test_key")
         assert await cache_service.get("test_key") is None
     
+    @pytest.mark.asyncio
+    async def test_get_many(self, cache_service):
+        """Test fetching several keys in one call, with None for a missing key."""
+        assert await cache_service.set("many_1", {"id": 1}, 60)
+        assert await cache_service.set("many_2", "second", 60)
+        assert await cache_service.set("many_3", 3, 60)
+        
+        values = await cache_service.get_many(["many_1", "many_missing", "many_2", "many_3"])
+        assert values == [{"id": 1}, None, "second", 3]
+        
+        assert await cache_service.get_many([]) == []
+    
+    @pytest.mark.asyncio
+    async def test_background_writes(self, cache_service, monkeypatch):
+        """Test scheduled writes land once their task runs and writes past the cap are dropped."""
+        import cache
+        
+        assert cache_service.set_nowait("nowait_key", "value", 60)
+        await asyncio.gather(*cache_service._pending)
+        assert await cache_service.get("nowait_key") == "value"
+        assert not cache_service._pending
+        
+        monkeypatch.setattr(cache, "MAX_PENDING_WRITES", 2)
+        assert cache_service.set_nowait("capped_1", 1, 60)
+        assert cache_service.set_nowait("capped_2", 2, 60)
+        assert not cache_service.set_nowait("capped_3", 3, 60)
+        await asyncio.gather(*cache_service._pending)
+        
+        assert await cache_service.get_many(["capped_1", "capped_2", "capped_3"]) == [1, 2, None]
+    
+    @pytest.mark.asyncio
+    async def test_large_values_are_compressed(self, cache_service):
+        """Test values above COMPRESS_MIN_BYTES are stored compressed and round-trip."""
+        from cache import COMPRESS_MIN_BYTES, TAG_COMPRESSED, TAG_JSON
+        from config import CACHE_PREFIX
+        
+        small = {"title": "short"}
+        large = [{"title": "task", "description": "x" * 100} for _ in range(50)]
+        assert await cache_service.set("small_value", small, 60)
+        assert await cache_service.set("large_value", large, 60)
+        
+        client = await cache_service._client()
+        raw_small = await client.get(CACHE_PREFIX + "small_value")
+        raw_large = await client.get(CACHE_PREFIX + "large_value")
+        assert raw_small[:1] == TAG_JSON
+        assert raw_large[:1] == TAG_COMPRESSED
+        assert len(raw_large) < COMPRESS_MIN_BYTES
+        
+        assert await cache_service.get("small_value") == small
+        assert await cache_service.get("large_value") == large
+    
     @pytest.mark.asyncio
     async def test_cache_expiration(self, cache_service):
         """Test cache expiration."""
@@ -203,8 +242,10 @@ class TestSessionManagement:
         assert session.user_id == user.id
         assert session.username == user.username
         assert session.role == user.role
-        assert isinstance(session.created_at, datetime)
-        assert isinstance(session.last_accessed, datetime)
+        assert isinstance(session.created_at, int)
+        assert isinstance(session.last_accessed, int)
+        assert isinstance(session.created_datetime, datetime)
+        assert isinstance(session.last_accessed_datetime, datetime)
     
     @pytest.mark.asyncio
     async def test_session_update(self, cache_service, session_manager):
@@ -273,23 +314,16 @@ class TestSessionManagement:
         session_id = await session_manager.create_session(user)
         
         # Manually expire session by setting old last_accessed time
-        session = await session_manager.get_session(session_id)
         old_time = datetime.utcnow() - timedelta(days=2)  # 2 days ago
-        session.last_accessed = old_time
-        
-        await cache_service.set(
-            session_id,
-            session.dict(),
-            300,  # Short TTL for test
-            "todo_session:"
-        )
+        client = await cache_service._client()
+        await client.hset("todo_session:" + session_id, "last_accessed", int(old_time.timestamp()))
         
         # Run cleanup
         cleaned = await session_manager.cleanup_expired_sessions()
         
-        # For FakeRedis, this should clean up expired sessions
-        # (In real Redis, TTL handles this automatically)
-        assert cleaned >= 0  # May be 0 if FakeRedis doesn't support this
+        # The stale session is removed even though its Redis TTL has not run out
+        assert cleaned >= 1
+        assert await session_manager.get_session(session_id) is None
     
     def test_session_id_generation(self, session_manager):
         """Test session ID generation."""
@@ -361,6 +395,27 @@ class TestCacheIntegration:
         await invalidate_task_data(task_id, user_id)
         assert await cache_service.get_task(task_id) is None
         assert await cache_service.get_user_tasks(user_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_user_tasks_pages(self, cache_service):
+        """Test serialized task list pages and their invalidation."""
+        user_id = 321
+        body = b'[{"id":1,"title":"Task 1"}]'
+        
+        assert await cache_service.get_user_tasks_page(user_id, "0:100:None:None") is None
+        
+        assert await cache_service.cache_user_tasks_page(user_id, "0:100:None:None", body, 300)
+        assert await cache_service.cache_user_tasks_page(user_id, "0:10:True:high", b"[]", 300)
+        assert await cache_service.get_user_tasks_page(user_id, "0:100:None:None") == body
+        
+        # Any task change drops every page at once
+        await cache_service.invalidate_task_cache(1, user_id)
+        assert await cache_service.get_user_tasks_page(user_id, "0:100:None:None") is None
+        assert await cache_service.get_user_tasks_page(user_id, "0:10:True:high") is None
+        
+        await cache_service.cache_user_tasks_page(user_id, "0:100:None:None", body, 300)
+        await cache_service.invalidate_user_cache(user_id)
+        assert await cache_service.get_user_tasks_page(user_id, "0:100:None:None") is None
 
 # Run tests
 if __name__ == "__main__":